@@ -0,0 +1,334 @@
+"""Rollup cube (hari x kategori x produk) yang menjadi sumber semua grafik dashboard."""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from calendar_dim import MOVING_AVERAGE_WINDOWS, daily_series, moving_average
+from filters import NAT_DAY_KEY, to_day_key
+from groupby_engine import GroupIndex, aggregate, top_k
+from ingest import ROWS_COLUMN, concat_frames, count_column, day_key_column, day_keys
+
+
+def _as_category(series):
+    """Kolom key sebagai Categorical (codes + kamus); kolom teks biasa di-factorize di sini"""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    return series.array
+
+
+class RollupCube:
+    """Agregasi per hari x kategori x produk, dibangun sekali per dataset dan kolom nilai.
+
+    Kolom cube: `day` (int day key), `category`, `product` (jika ada), `value` (sum kolom
+    nilai), `value_count` (jumlah nilai non-null), `rows` (jumlah baris), serta `profit`
+    dan `total_price` jika kolom `Profit` / `Total_Price` tersedia.
+
+    Input pra-agregasi (hasil `ingest.stream_csv`) juga didukung: jumlah baris dan jumlah
+    nilai diambil dari kolom `ROWS_COLUMN` dan `count_column(value_column)`.
+    """
+
+    def __init__(self, df, date_column, value_column, category_column=None, product_column=None):
+        self.date_column = date_column
+        self.value_column = value_column
+        self.category_column = category_column
+        self.product_column = product_column
+
+        keys = {}
+        if date_column:
+            key_column = day_key_column(date_column)
+            keys['day'] = df[key_column].to_numpy() if key_column in df.columns else day_keys(df[date_column])
+        else:
+            keys['day'] = np.zeros(len(df), dtype=np.int32)
+        # Key teks di-factorize sekali ke categorical supaya semua agregasi memakai integer codes
+        if category_column:
+            keys['category'] = _as_category(df[category_column])
+        if product_column:
+            keys['product'] = _as_category(df[product_column])
+
+        frame = pd.DataFrame(keys)
+        frame['value'] = df[value_column].to_numpy()
+        sums = {'value': 'value'}
+        if ROWS_COLUMN in df.columns:
+            frame['value_count'] = df[count_column(value_column)].to_numpy()
+            frame['rows'] = df[ROWS_COLUMN].to_numpy()
+            sums.update(value_count='value_count', rows='rows')
+            counts, size = {}, None
+        else:
+            counts, size = {'value_count': 'value'}, 'rows'
+        self.has_profit = 'Profit' in df.columns and 'Total_Price' in df.columns
+        if self.has_profit:
+            frame['profit'] = df['Profit'].to_numpy()
+            frame['total_price'] = df['Total_Price'].to_numpy()
+            sums.update(profit='profit', total_price='total_price')
+
+        # Baris NaT tidak pernah lolos filter tanggal
+        if (frame['day'] == NAT_DAY_KEY).any():
+            frame = frame[frame['day'] != NAT_DAY_KEY]
+
+        # dropna=False supaya jumlah transaksi tetap menghitung baris dengan kategori kosong
+        self.cube = aggregate(frame, list(keys), sums=sums, counts=counts, size=size, dropna=False)
+        self.days = self.cube['day'].to_numpy()
+
+    @classmethod
+    def from_frame(cls, cube, date_column, value_column, category_column=None, product_column=None):
+        """Cube dari frame yang sudah diagregasi (mis. rollup tersimpan); harus terurut per hari"""
+        self = cls.__new__(cls)
+        self.date_column = date_column
+        self.value_column = value_column
+        self.category_column = category_column
+        self.product_column = product_column
+        self.has_profit = 'profit' in cube.columns
+        self.cube = cube.reset_index(drop=True)
+        self.days = self.cube['day'].to_numpy()
+        return self
+
+    def replace_days(self, other):
+        """Cube baru: isi hari-hari yang ada di `other` diganti, hari lain tetap (update inkremental)"""
+        keep = ~np.isin(self.days, np.unique(other.days))
+        cube = concat_frames([self.cube[keep], other.cube])
+        cube = cube.iloc[np.argsort(cube['day'].to_numpy(), kind='stable')]
+        return RollupCube.from_frame(cube, self.date_column, self.value_column,
+                                     self.category_column, self.product_column)
+
+    def filter(self, start_date=None, end_date=None, categories=None, products=None):
+        """Terapkan filter sidebar ke cube (cube terurut per hari, jadi tanggal = slice)"""
+        cube = self.cube
+        if start_date is not None and end_date is not None:
+            lo = int(self.days.searchsorted(to_day_key(start_date), side='left'))
+            hi = int(self.days.searchsorted(to_day_key(end_date), side='right'))
+            cube = cube.iloc[lo:max(lo, hi)]
+        if categories and 'category' in cube.columns:
+            cube = cube[cube['category'].isin(categories)]
+        if products and 'product' in cube.columns:
+            cube = cube[cube['product'].isin(products)]
+        return cube
+
+
+# ==================== AGREGASI DARI CUBE TERFILTER ====================
+def unique_products(cube):
+    return int((GroupIndex([cube['product']]).size() > 0).sum()) if 'product' in cube.columns else None
+
+
+def summary(cube):
+    """Total, rata-rata, jumlah transaksi dan jumlah produk unik"""
+    total = cube['value'].sum()
+    count = cube['value_count'].sum()
+    return {
+        'total': total,
+        'average': total / count if count else 0,
+        'transactions': int(cube['rows'].sum()),
+        'unique_products': unique_products(cube),
+    }
+
+
+def by_category(cube):
+    """Sum nilai, jumlah baris (dan profit/total price jika ada) per kategori"""
+    columns = [col for col in ('value', 'rows', 'profit', 'total_price') if col in cube.columns]
+    return aggregate(cube, ['category'], sums={col: col for col in columns})
+
+
+def top_products(cube, k=10):
+    index = GroupIndex([cube['product']])
+    totals = index.sum(cube['value'])
+    observed = np.flatnonzero(index.size())
+    best = observed[top_k(totals[observed], k)]
+    result = index.key_frame(best)
+    result['value'] = totals[best]
+    return result
+
+
+def product_detail_rows(cube):
+    """Jumlah baris tabel detail produk (grup kategori x produk yang muncul), untuk batas paginasi"""
+    keys = [key for key in ('category', 'product') if key in cube.columns]
+    return int(np.count_nonzero(GroupIndex([cube[key] for key in keys]).size()))
+
+
+def product_detail(cube, page=0, page_size=20, sort_by='value', descending=True):
+    """Satu halaman tabel (kategori x) produk, diurutkan di server. Return (halaman, jumlah baris).
+
+    Hanya baris di halaman yang diminta yang di-materialize menjadi label; urutan nilai memakai
+    partial selection sampai akhir halaman, urutan label memakai codes categorical (alfabetis).
+    """
+    keys = [key for key in ('category', 'product') if key in cube.columns]
+    index = GroupIndex([cube[key] for key in keys])
+    observed = np.flatnonzero(index.size())
+    totals = index.sum(cube['value'])[observed]
+    start, stop = page * page_size, (page + 1) * page_size
+
+    if sort_by == 'value':
+        order = top_k(totals if descending else -totals, stop)[start:]
+    else:
+        # Codes per key untuk grup yang muncul; key yang diminta jadi urutan utama
+        codes = dict(zip(keys, index.group_codes(observed)))
+        primary = codes[sort_by]
+        secondary = [codes[key] for key in keys if key != sort_by]
+        order = np.lexsort(secondary[::-1] + [primary])
+        if descending:
+            order = order[::-1]
+        order = order[start:stop]
+
+    result = index.key_frame(observed[order])
+    result['value'] = totals[order]
+    return result, len(observed)
+
+
+def daily(cube):
+    per_day = aggregate(cube, ['day'], sums={'value': 'value'})
+    return pd.DataFrame({
+        'date': pd.to_datetime(per_day['day'].to_numpy().astype('datetime64[D]')),
+        'value': per_day['value'].to_numpy()
+    })
+
+
+def trend_detail(df, date_column, value_column, start, end):
+    """Sum nilai per timestamp asli (resolusi penuh) dalam rentang zoom; df harus terurut per tanggal"""
+    dates = df[date_column]
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    values = dates.to_numpy()
+    lo = int(values.searchsorted(np.datetime64(start), side='left'))
+    hi = int(values.searchsorted(np.datetime64(end), side='right'))
+    window = pd.DataFrame({
+        'ts': values[lo:hi].view(np.int64),
+        'value': df[value_column].to_numpy()[lo:hi]
+    })
+    per_ts = aggregate(window, ['ts'], sums={'value': 'value'})
+    return pd.DataFrame({
+        'date': per_ts['ts'].to_numpy().astype(np.int64).view(values.dtype),
+        'value': per_ts['value'].to_numpy()
+    })
+
+
+def periods(cube, calendar, granularity):
+    """Total dan rata-rata per transaksi per periode kalender (hari/minggu ISO/bulan/kuartal)"""
+    per_day = aggregate(cube, ['day'], sums={'value': 'value', 'value_count': 'value_count'})
+    keys, starts, sums = calendar.totals(granularity, per_day['day'].to_numpy(), {
+        'value': per_day['value'].to_numpy(dtype=np.float64),
+        'value_count': per_day['value_count'].to_numpy(dtype=np.float64),
+    })
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average = sums['value'] / sums['value_count']
+    return pd.DataFrame({
+        'period': keys,
+        'date': pd.to_datetime(starts.astype('datetime64[D]')),
+        'value': sums['value'],
+        'average': average,
+    })
+
+
+def moving_averages(cube, start_day, end_day, windows=MOVING_AVERAGE_WINDOWS):
+    """Moving average harian per hari kalender start_day..end_day.
+
+    `cube` harus mencakup max(windows) - 1 hari sebelum start_day supaya awal rentang
+    memakai jendela penuh. Return DataFrame `date` + `ma_<window>`.
+    """
+    per_day = aggregate(cube, ['day'], sums={'value': 'value'})
+    lo_day = start_day - max(windows) + 1
+    series = daily_series(per_day['day'].to_numpy(), per_day['value'].to_numpy(dtype=np.float64), lo_day, end_day)
+    result = pd.DataFrame({'date': pd.to_datetime(np.arange(start_day, end_day + 1).astype('datetime64[D]'))})
+    for window in windows:
+        result[f'ma_{window}'] = moving_average(series, window)[start_day - lo_day:]
+    return result
+
+
+def monthly(cube, calendar):
+    per_month = periods(cube, calendar, 'month')
+    return pd.DataFrame({
+        'month': [f"{key // 100}-{key % 100:02d}" for key in per_month['period']],
+        'value': per_month['value'].to_numpy(),
+    })
+
+
+def weekly_average(cube, calendar):
+    """Rata-rata nilai per transaksi per minggu ISO (tahun ISO + minggu, tahun tidak digabung)"""
+    per_week = periods(cube, calendar, 'week')
+    return pd.DataFrame({
+        'week': [f"{key // 100}-W{key % 100:02d}" for key in per_week['period']],
+        'value': per_week['average'].to_numpy(),
+    })
+
+
+# ==================== PERBANDINGAN PERIODE ====================
+def comparison_ranges(start_date, end_date):
+    """Rentang pembanding: periode sebelumnya dengan panjang sama dan periode yang sama tahun lalu"""
+    length = end_date - start_date + timedelta(days=1)
+
+    def year_earlier(value):
+        # 29 Februari -> 28 Februari
+        return value.replace(year=value.year - 1, day=min(value.day, 28) if value.month == 2 else value.day)
+
+    return {
+        'previous': (start_date - length, start_date - timedelta(days=1)),
+        'last_year': (year_earlier(start_date), year_earlier(end_date)),
+    }
+
+
+class PrefixSums:
+    """Prefix sum harian per kategori dari cube, dibangun sekali per cube.
+
+    Total, jumlah nilai dan jumlah transaksi untuk rentang tanggal apa pun menjadi selisih dua
+    posisi prefix sum per kategori terpilih, tanpa memfilter atau mengagregasi ulang cube.
+    """
+
+    COLUMNS = ('value', 'value_count', 'rows')
+
+    def __init__(self, rollup):
+        cube = rollup.cube
+        days = np.asarray(rollup.days, dtype=np.int64)
+        self.first_day = int(days[0]) if len(days) else 0
+        self.n_days = int(days[-1]) - self.first_day + 1 if len(days) else 0
+        if 'category' in cube.columns:
+            categories = cube['category'].array
+            self.lookup = {value: code for code, value in enumerate(categories.categories)}
+            # Kategori kosong (code -1) jadi grup terakhir: ikut total, tidak bisa dipilih
+            groups = len(self.lookup) + 1
+            codes = np.where(categories.codes < 0, groups - 1, categories.codes).astype(np.int64)
+        else:
+            self.lookup = {}
+            groups = 1
+            codes = np.zeros(len(cube), dtype=np.int64)
+        cells = codes * self.n_days + (days - self.first_day)
+
+        self.sums = {}
+        for column in self.COLUMNS:
+            grid = np.bincount(cells, weights=cube[column].to_numpy(dtype=np.float64), minlength=groups * self.n_days)
+            self.sums[column] = np.concatenate(
+                [np.zeros((groups, 1)), np.cumsum(grid.reshape(groups, self.n_days), axis=1)], axis=1
+            )
+        self.totals = {column: sums.sum(axis=0) for column, sums in self.sums.items()}
+
+    def range(self, start_date, end_date, categories=None):
+        """Jumlah per kolom untuk tanggal start_date..end_date (inklusif) dan kategori terpilih"""
+        lo = min(max(to_day_key(start_date) - self.first_day, 0), self.n_days)
+        hi = min(max(to_day_key(end_date) - self.first_day + 1, lo), self.n_days)
+        if categories:
+            groups = [self.lookup[value] for value in categories if value in self.lookup]
+            return {column: float((sums[groups, hi] - sums[groups, lo]).sum()) for column, sums in self.sums.items()}
+        return {column: float(sums[hi] - sums[lo]) for column, sums in self.totals.items()}
+
+
+def compare_periods(rollup, prefix_sums, start_date, end_date, categories=None, products=None):
+    """Summary (seperti `summary`) untuk setiap rentang pembanding; None jika rentang itu tanpa data.
+
+    Total, rata-rata dan transaksi dari prefix sum; jumlah produk unik (dan semua metrik
+    jika produk difilter) dari slice cube per tanggal, karena tidak bisa dijumlahkan per hari.
+    `partial` bernilai True jika rentang pembanding dimulai sebelum tanggal pertama data, jadi
+    hanya sebagian periode itu yang tercakup dan selisihnya tidak sebanding.
+    """
+    result = {}
+    for name, (start, end) in comparison_ranges(start_date, end_date).items():
+        if products:
+            totals = summary(rollup.filter(start, end, categories, products))
+        else:
+            sums = prefix_sums.range(start, end, categories)
+            totals = {
+                'total': sums['value'],
+                'average': sums['value'] / sums['value_count'] if sums['value_count'] else 0,
+                'transactions': int(sums['rows']),
+                'unique_products': unique_products(rollup.filter(start, end, categories))
+                if rollup.product_column else None,
+            }
+        totals['partial'] = prefix_sums.n_days > 0 and to_day_key(start) < prefix_sums.first_day
+        result[name] = totals if totals['transactions'] else None
+    return result
@@ -0,0 +1,254 @@
+"""Benchmark headless untuk jalur kode dashboard (tanpa browser / Streamlit).
+
+Untuk setiap skala data sintetis (skema `generate_sample_data`) diukur: parsing CSV/Excel,
+parsing paralel satu CSV per toko, pembersihan kolom, parsing tanggal, kompaksi, profil,
+filter tanggal, bitmap filter kategori/produk (baru dan dari memo), cube dan semua agregasi
+per tab, serta pembuatan + serialisasi JSON setiap figure Plotly.
+
+    python benchmark.py --rows 10000 100000 1000000 -o results.json
+    python benchmark.py --rows 10000 100000 --baseline results.json --tolerance 0.25
+
+Hasil: waktu (minimum dari `--repeat` kali), throughput (baris/detik) dan puncak memori
+(RSS di atas awal tahap, disampling di thread terpisah). Dengan `--baseline`, tahap yang
+lebih lambat dari baseline melebihi toleransi ditandai dan exit code menjadi 1.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.io as pio
+
+import charts
+from aggregations import (PrefixSums, RollupCube, by_category, compare_periods, daily, monthly, moving_averages,
+                          periods, product_detail, summary, top_products, trend_detail, weekly_average)
+from calendar_dim import Calendar
+from downsample import downsample
+from filters import DateIndex, FilterIndex, ValueBitmaps
+from ingest import clean_columns, compact_frame, parse_dates, parse_many, read_excel_fast, stream_csv
+from profiler import profile_frame
+from sample_data import generate_sample_data
+from sampling import StratifiedSample
+from search import ProductSearchIndex
+from timing import rss_bytes
+
+# Waktu di bawah ini dianggap noise dan tidak dibandingkan dengan baseline
+MIN_COMPARE_SECONDS = 0.005
+
+
+class PeakMemory:
+    """Puncak RSS selama blok berjalan (MB di atas RSS awal), disampling tiap `interval` detik"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak_mb = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, rss_bytes() or 0)
+
+    def __enter__(self):
+        self._start = self._peak = rss_bytes() or 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._peak = max(self._peak, rss_bytes() or 0)
+        self.start_mb = self._start / 1024 ** 2
+        self.peak_mb = (self._peak - self._start) / 1024 ** 2
+        return False
+
+
+class Bench:
+    def __init__(self, repeat=1):
+        self.repeat = repeat
+        self.results = []
+
+    def run(self, rows, stage, func, *args, **kwargs):
+        """Jalankan `func` `repeat` kali; catat waktu minimum dan puncak memori terbesar"""
+        best, peak, result = None, 0.0, None
+        for _ in range(self.repeat):
+            result = None
+            with PeakMemory() as memory:
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+            peak = max(peak, memory.peak_mb)
+        self.results.append({
+            'rows': rows,
+            'stage': stage,
+            'seconds': best,
+            'rows_per_s': rows / best if best > 0 else None,
+            'peak_mb': peak,
+        })
+        print(f"{rows:>12,} {stage:<24} {best * 1000:>10.1f} ms {rows / max(best, 1e-9):>14,.0f} rows/s {peak:>8.1f} MB",
+              flush=True)
+        return result
+
+
+def make_dataset(rows, seed=42):
+    """Data sintetis satu tahun, 10 toko, katalog produk sebanding ukuran data"""
+    days = 365
+    return generate_sample_data(
+        days=days, stores=10, n_categories=8, n_products=int(min(max(rows // 50, 15), 50_000)),
+        rows_per_day=max(rows // days, 1), seed=seed
+    )
+
+
+def run_scale(bench, rows, excel_max_rows, pool=None):
+    data = make_dataset(rows)
+    rows = len(data)
+
+    # ---------- Ingest (buffer baru per pengulangan) ----------
+    csv_bytes = data.to_csv(index=False).encode('utf-8')
+    raw = bench.run(rows, 'read_csv', lambda: pd.read_csv(io.BytesIO(csv_bytes)))
+    if rows <= excel_max_rows:
+        excel_buffer = io.BytesIO()
+        data.to_excel(excel_buffer, index=False)
+        bench.run(rows, 'read_excel', lambda: pd.read_excel(io.BytesIO(excel_buffer.getvalue())))
+        bench.run(rows, 'read_excel_fast', read_excel_fast, io.BytesIO(excel_buffer.getvalue()))
+        bench.run(rows, 'read_excel_columns', lambda: read_excel_fast(
+            io.BytesIO(excel_buffer.getvalue()), columns=['Date', 'Category', 'Product', 'Total_Price', 'Profit']))
+    raw = bench.run(rows, 'clean_columns', lambda: clean_columns(raw.copy()))
+    raw = bench.run(rows, 'parse_dates', lambda: parse_dates(raw.copy()))
+    df = bench.run(rows, 'compact_frame', compact_frame, raw)
+    bench.run(rows, 'stream_csv', lambda: stream_csv(io.BytesIO(csv_bytes)))
+    # Satu CSV per toko, di-parse paralel di process pool (pool dibuat di luar pengukuran)
+    store_files = [(f"{store}.csv", part.to_csv(index=False).encode('utf-8'))
+                   for store, part in data.groupby('Store', observed=True)]
+    bench.run(rows, 'parse_many', parse_many, store_files, pool, compact_frame)
+    del store_files
+    del raw, csv_bytes
+
+    # ---------- Sidebar ----------
+    bench.run(rows, 'profile', profile_frame, df)
+    date_index = bench.run(rows, 'date_index', DateIndex, df, 'Date')
+    df = date_index.frame
+    start_date = date_index.min_date + (date_index.max_date - date_index.min_date) / 4
+    end_date = date_index.max_date - (date_index.max_date - date_index.min_date) / 4
+    df_filtered = bench.run(rows, 'date_filter', date_index.slice, start_date, end_date)
+    categories = list(df['Category'].cat.categories[:3])
+    search_index = bench.run(rows, 'search_index', ProductSearchIndex, df['Product'], df['Category'])
+    products = bench.run(rows, 'product_search', search_index.search, 'sku-00', 10, categories)
+    # Bitmap index dibangun sekali per dataset; seleksi baru (tanpa memo) lalu seleksi yang di-memo
+    row_range = date_index.bounds(start_date, end_date)
+    bench.run(rows, 'filter_index', lambda: [ValueBitmaps(df[col]) for col in ('Category', 'Product')])
+    value_filters = {'Category': categories, 'Product': products}
+    bench.run(rows, 'value_filter', FilterIndex(df, memo_size=0).select, *row_range, value_filters)
+    filter_index = FilterIndex(df)
+    filter_index.select(*row_range, value_filters)
+    df_filtered = bench.run(rows, 'value_filter_memo', filter_index.select, *row_range, value_filters)
+
+    # ---------- Agregasi ----------
+    cube = bench.run(rows, 'cube', RollupCube, df, 'Date', 'Total_Price', 'Category', 'Product')
+    # Mode progresif: sampel bertingkat + cube berbobot sebagai pratinjau
+    sample = bench.run(rows, 'stratified_sample', StratifiedSample, df, 'Date', 'Category', 100_000)
+    bench.run(rows, 'sample_cube', sample.cube, 'Total_Price', 'Category', 'Product')
+    bench.run(rows, 'sample_estimate', sample.estimate, 'Total_Price', start_date, end_date, 'Category', categories)
+    cube_filtered = bench.run(rows, 'cube_filter', cube.filter, start_date, end_date, categories)
+    bench.run(rows, 'summary', summary, cube_filtered)
+    prefix_sums = bench.run(rows, 'prefix_sums', PrefixSums, cube)
+    bench.run(rows, 'compare_periods', compare_periods, cube, prefix_sums, start_date, end_date, categories)
+    category_data = bench.run(rows, 'by_category', by_category, cube_filtered)
+    best_products = bench.run(rows, 'top_products', top_products, cube_filtered, 10)
+    bench.run(rows, 'product_detail', product_detail, cube_filtered, 0, 20)
+    trend_data = bench.run(rows, 'daily', daily, cube_filtered)
+    bench.run(rows, 'trend_detail', trend_detail, df_filtered, 'Date', 'Total_Price', start_date, end_date)
+    keep = bench.run(rows, 'downsample', downsample,
+                     trend_data['date'].to_numpy().astype(np.int64), trend_data['value'].to_numpy(), 2000)
+    calendar = bench.run(rows, 'calendar', Calendar.from_days, cube.days)
+    for granularity in ('week', 'quarter'):
+        bench.run(rows, f'periods:{granularity}', periods, cube_filtered, calendar, granularity)
+    trend_days = trend_data['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    bench.run(rows, 'moving_averages', moving_averages,
+              cube.filter(None, None, categories), int(trend_days[0]), int(trend_days[-1]))
+    monthly_data = bench.run(rows, 'monthly', monthly, cube_filtered, calendar)
+    weekly_data = bench.run(rows, 'weekly_average', weekly_average, cube_filtered, calendar)
+
+    # ---------- Figure: build + serialisasi JSON ----------
+    figures = {
+        'category_value_bar': (charts.category_value_bar, (category_data, 'Total_Price', True, 'Category')),
+        'category_pie': (charts.category_pie, (category_data,)),
+        'profit_margin_bar': (charts.profit_margin_bar, (category_data, 'Category')),
+        'top_products_bar': (charts.top_products_bar, (best_products, 'Total_Price', True, 'Products')),
+        'trend_line': (charts.trend_line, (trend_data.iloc[keep], 'Total_Price', True, 'Date', len(keep) > 1000)),
+        'monthly_bar': (charts.monthly_bar, (monthly_data, 'Total_Price', True)),
+        'weekly_line': (charts.weekly_line, (weekly_data, 'Total_Price', True)),
+    }
+    for name, (builder, args) in figures.items():
+        fig = bench.run(rows, f'figure:{name}', builder, *args)
+        # Serialisasi yang sama dengan st.plotly_chart
+        bench.run(rows, f'json:{name}', pio.to_json, fig, validate=False)
+
+
+def compare(results, baseline, tolerance):
+    """Tahap yang lebih lambat dari baseline lebih dari `tolerance` (rasio)"""
+    previous = {(r['rows'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        base = previous.get((result['rows'], result['stage']))
+        if base is None or max(result['seconds'], base['seconds']) < MIN_COMPARE_SECONDS:
+            continue
+        ratio = result['seconds'] / base['seconds'] if base['seconds'] > 0 else float('inf')
+        if ratio > 1 + tolerance:
+            regressions.append({**result, 'baseline_seconds': base['seconds'], 'ratio': ratio})
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark dashboard code paths on synthetic data")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage; the fastest one is reported")
+    parser.add_argument('--excel-max-rows', type=int, default=20_000,
+                        help="Skip the Excel parsing stage above this many rows")
+    parser.add_argument('-o', '--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help="Previous results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown ratio before a stage is flagged (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    bench = Bench(repeat=args.repeat)
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn')) as pool:
+        for n in args.rows:
+            run_scale(bench, n, args.excel_max_rows, pool)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plotly': plotly.__version__,
+            'repeat': args.repeat,
+            'cpus': os.cpu_count(),
+        },
+        'results': bench.results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(bench.results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"SLOWER {r['rows']:>12,} {r['stage']:<24} {r['baseline_seconds'] * 1000:>10.1f} ms -> "
+                  f"{r['seconds'] * 1000:.1f} ms (x{r['ratio']:.2f})")
+        print(f"{len(regressions)} stage(s) slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,111 @@
+"""Dimensi kalender: setiap day key (hari sejak epoch) dipetakan ke key periode integer.
+
+Key periode per hari kalender: `week` (tahun ISO * 100 + minggu ISO, jadi minggu 1 tahun
+2024 dan 2025 tidak tergabung), `month` (tahun * 100 + bulan), `quarter` (tahun * 10 +
+kuartal) dan `dow` (hari dalam minggu, 0 = Senin). Tabel dibangun sekali per dataset untuk
+rentang day key-nya; baris data hanya membawa day key, dan agregasi per periode menjadi
+lookup array + `bincount` atas hari unik, bukan kerja string per baris.
+"""
+import numpy as np
+
+from filters import NAT_DAY_KEY
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter')
+# Jendela moving average harian (hari)
+MOVING_AVERAGE_WINDOWS = (7, 28)
+
+
+def _year(dates):
+    return dates.astype('datetime64[Y]').astype(np.int64) + 1970
+
+
+class Calendar:
+    """Tabel kalender untuk day key `first_day`..`last_day` (inklusif), indeks = day - first_day"""
+
+    def __init__(self, first_day, last_day):
+        self.first_day = int(first_day)
+        days = np.arange(self.first_day, int(last_day) + 1)
+        dates = days.astype('datetime64[D]')
+        year = _year(dates)
+        month = dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        # 1970-01-01 adalah hari Kamis
+        dow = (days + 3) % 7
+        # Tahun ISO ditentukan oleh hari Kamis di minggu yang sama
+        thursday = days - dow + 3
+        iso_year = _year(thursday.astype('datetime64[D]'))
+        iso_year_start = (iso_year - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(np.int64)
+        iso_week = (thursday - iso_year_start) // 7 + 1
+
+        self.days = days
+        self.keys = {
+            'day': days,
+            'week': iso_year * 100 + iso_week,
+            'month': year * 100 + month,
+            'quarter': year * 10 + (month - 1) // 3 + 1,
+            'dow': dow,
+        }
+        # Hari pertama setiap periode (untuk sumbu x grafik)
+        self.starts = {
+            'day': days,
+            'week': days - dow,
+            'month': dates.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64),
+            'quarter': ((year - 1970) * 12 + (month - 1) // 3 * 3).astype('datetime64[M]')
+                       .astype('datetime64[D]').astype(np.int64),
+        }
+        # Periode kalender berurutan, jadi codes rapat = jumlah pergantian key sebelum hari itu
+        self.codes = {}
+        self.period_first = {}  # posisi hari pertama setiap code periode
+        for granularity in GRANULARITIES:
+            change = np.concatenate([[True], np.diff(self.keys[granularity]) != 0])
+            self.codes[granularity] = np.cumsum(change) - 1
+            self.period_first[granularity] = np.flatnonzero(change)
+
+    @classmethod
+    def from_days(cls, days):
+        """Kalender untuk rentang day key terurut (NaT di depan); None jika tidak ada tanggal valid"""
+        first = int(np.asarray(days).searchsorted(NAT_DAY_KEY, side='right'))
+        if first >= len(days):
+            return None
+        return cls(days[first], days[-1])
+
+    def __len__(self):
+        return len(self.days)
+
+    def index(self, days):
+        """Posisi day key di tabel kalender"""
+        return np.asarray(days, dtype=np.int64) - self.first_day
+
+    def key(self, granularity, days):
+        """Key periode integer untuk day key"""
+        return self.keys[granularity][self.index(days)]
+
+    def totals(self, granularity, days, weights):
+        """Jumlah `weights` per periode untuk hari unik `days`.
+
+        Return (key periode, day key awal periode, {nama: jumlah}) untuk periode yang berisi
+        setidaknya satu hari di `days`.
+        """
+        codes = self.codes[granularity][self.index(days)]
+        periods = len(self.period_first[granularity])
+        present = np.bincount(codes, minlength=periods) > 0
+        sums = {name: np.bincount(codes, weights=values, minlength=periods)[present]
+                for name, values in weights.items()}
+        first = self.period_first[granularity][present]
+        return self.keys[granularity][first], self.starts[granularity][first], sums
+
+
+def daily_series(days, values, lo_day, hi_day):
+    """Nilai per hari kalender lo_day..hi_day dari hari unik `days` (hari tanpa data = 0)"""
+    series = np.zeros(hi_day - lo_day + 1)
+    inside = (days >= lo_day) & (days <= hi_day)
+    series[np.asarray(days[inside], dtype=np.int64) - lo_day] = values[inside]
+    return series
+
+
+def moving_average(series, window):
+    """Rata-rata bergulir `window` hari lewat prefix sum; NaN sampai jendela penuh"""
+    result = np.full(len(series), np.nan)
+    if len(series) >= window:
+        prefix = np.concatenate([[0.0], np.cumsum(series)])
+        result[window - 1:] = (prefix[window:] - prefix[:-window]) / window
+    return result
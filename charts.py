@@ -0,0 +1,167 @@
+"""Pembuat figure Plotly untuk dashboard. Input = hasil agregasi dari aggregations.py.
+
+Dipisah dari supermarket.py supaya bisa dipakai ulang (dan diukur) tanpa Streamlit.
+"""
+import plotly.express as px
+import plotly.graph_objects as go
+
+TRANSPARENT = dict(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+
+
+def value_axis_title(value_column, is_currency, prefix=""):
+    return f"{prefix}{value_column} ({'$' if is_currency else 'Units'})"
+
+
+def _value_labels(values, is_currency):
+    return [f"${x:,.0f}" if is_currency else f"{x:,.0f}" for x in values]
+
+
+def category_value_bar(data, value_column, is_currency, category_label):
+    """Grafik 1: nilai per kategori (`by_category`)"""
+    fig = go.Figure(data=[
+        go.Bar(
+            x=data['category'],
+            y=data['value'],
+            marker_color=['#1E3A8A', '#3B82F6', '#60A5FA', '#93C5FD', '#BFDBFE', '#E0F2FE'],
+            text=_value_labels(data['value'], is_currency),
+            textposition='auto'
+        )
+    ])
+    fig.update_layout(
+        **TRANSPARENT,
+        yaxis_title=value_axis_title(value_column, is_currency),
+        xaxis_title=category_label,
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def category_pie(data):
+    """Distribusi jumlah transaksi per kategori (`by_category`)"""
+    category_dist = data[['category', 'rows']]
+    category_dist.columns = ['Category', 'Count']
+    fig = px.pie(
+        category_dist,
+        values='Count',
+        names='Category',
+        hole=0.4,
+        color_discrete_sequence=px.colors.sequential.Blues_r
+    )
+    fig.update_layout(**TRANSPARENT, height=400)
+    return fig
+
+
+def profit_margin_bar(data, category_label):
+    """Margin profit (%) per kategori (`by_category` dengan kolom profit/total_price)"""
+    margin = (data['profit'] / data['total_price']) * 100
+    fig = go.Figure(data=[
+        go.Bar(
+            x=data['category'],
+            y=margin,
+            marker=dict(color=margin, colorscale='Blues'),
+            text=[f"{x:.1f}%" for x in margin],
+            textposition='auto'
+        )
+    ])
+    fig.update_layout(
+        **TRANSPARENT,
+        yaxis_title="Profit Margin (%)",
+        xaxis_title=category_label,
+        height=400
+    )
+    return fig
+
+
+def top_products_bar(data, value_column, is_currency, products_label):
+    """Bar horizontal produk terlaris (`top_products`)"""
+    fig = go.Figure(data=[
+        go.Bar(
+            y=data['product'],
+            x=data['value'],
+            orientation='h',
+            marker_color='#3B82F6',
+            text=_value_labels(data['value'], is_currency),
+            textposition='auto'
+        )
+    ])
+    fig.update_layout(
+        **TRANSPARENT,
+        xaxis_title=value_axis_title(value_column, is_currency),
+        yaxis_title=products_label,
+        height=500
+    )
+    return fig
+
+
+def trend_line(points, value_column, is_currency, date_label, webgl=False, averages=None):
+    """Tren per periode (titik hasil downsampling); WebGL untuk seri besar.
+
+    `averages`: daftar (label, nilai) sejajar dengan `points`, digambar sebagai garis putus-putus.
+    """
+    scatter = go.Scattergl if webgl else go.Scatter
+    fig = go.Figure()
+    fig.add_trace(scatter(
+        x=points['date'],
+        y=points['value'],
+        mode='lines' if webgl else 'lines+markers',
+        name=value_column,
+        line=dict(color='#3B82F6', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(59, 130, 246, 0.1)'
+    ))
+    for (label, values), color in zip(averages or [], ['#F59E0B', '#10B981']):
+        fig.add_trace(scatter(
+            x=points['date'],
+            y=values,
+            mode='lines',
+            name=label,
+            line=dict(color=color, width=2, dash='dash')
+        ))
+    fig.update_layout(
+        **TRANSPARENT,
+        yaxis_title=value_axis_title(value_column, is_currency),
+        xaxis_title=date_label,
+        hovermode='x unified',
+        dragmode='select',
+        height=500
+    )
+    return fig
+
+
+def monthly_bar(data, value_column, is_currency):
+    """Nilai per bulan (`monthly`)"""
+    data = data.rename(columns={'month': 'Month', 'value': value_column})
+    fig = px.bar(
+        data,
+        x='Month',
+        y=value_column,
+        color=value_column,
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(
+        **TRANSPARENT,
+        height=400,
+        xaxis_title="Month",
+        yaxis_title=value_axis_title(value_column, is_currency)
+    )
+    return fig
+
+
+def weekly_line(data, value_column, is_currency):
+    """Rata-rata per minggu (`weekly_average`)"""
+    data = data.rename(columns={'week': 'Week', 'value': value_column})
+    fig = px.line(
+        data,
+        x='Week',
+        y=value_column,
+        markers=True,
+        line_shape='spline'
+    )
+    fig.update_layout(
+        **TRANSPARENT,
+        height=400,
+        xaxis_title="Week",
+        yaxis_title=value_axis_title(value_column, is_currency, prefix="Average ")
+    )
+    return fig
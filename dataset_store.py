@@ -0,0 +1,213 @@
+"""Dataset persisten: partisi Parquet per tanggal yang bisa ditambah (append) data harian.
+
+Struktur folder:
+
+    <root>/manifest.json             versi, kolom tanggal, skema kolom, jumlah baris per hari
+    <root>/parts/2024-01-01.parquet  satu partisi per tanggal
+    <root>/rollups/<key>.parquet     cube (hari x kategori x produk) per pilihan kolom
+
+Append memvalidasi skema terhadap manifest lalu menulis satu partisi per tanggal. Tanggal
+yang sudah ada diganti seluruhnya (data baru menang), jadi upload ulang hari yang sama tidak
+menggandakan data. Setiap rollup tersimpan diperbarui dari data baru saja
+(`RollupCube.replace_days`), bukan dihitung ulang dari seluruh histori.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aggregations import RollupCube
+from filters import NAT_DAY_KEY, from_day_key
+from ingest import content_hash, day_key_column, day_keys, detect_date_column, is_internal, sort_categories
+
+MANIFEST = 'manifest.json'
+# Thread untuk membaca partisi (pyarrow melepas GIL saat decode)
+READ_THREADS = 8
+
+
+class SchemaError(ValueError):
+    """Data baru tidak cocok dengan skema dataset"""
+
+
+def column_kind(dtype):
+    """Jenis kolom untuk validasi skema: datetime, numeric atau text"""
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_numeric_dtype(dtype):
+        return 'numeric'
+    return 'text'
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class PartitionedDataset:
+    """Dataset di `root` (dibuat saat append pertama); aman dipakai bersama oleh thread sesi"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def manifest(self):
+        """Isi manifest.json, atau None jika dataset belum ada"""
+        try:
+            with open(self._path(MANIFEST), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, manifest):
+        def write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1, ensure_ascii=False)
+        _write_atomic(self._path(MANIFEST), write)
+
+    def info(self):
+        """Ringkasan untuk UI: versi, jumlah baris/hari dan rentang tanggal; None jika kosong"""
+        manifest = self.manifest()
+        if not manifest or not manifest['days']:
+            return None
+        days = sorted(manifest['days'])
+        return {
+            'version': manifest['version'],
+            'rows': sum(manifest['days'].values()),
+            'days': len(days),
+            'first': days[0],
+            'last': days[-1],
+        }
+
+    def validate(self, df, manifest=None):
+        """Kolom tanggal dan skema {kolom: jenis} dari `df`; SchemaError jika tidak cocok dataset"""
+        schema = {col: column_kind(df[col].dtype) for col in df.columns if not is_internal(col)}
+        date_column = manifest['date_column'] if manifest else detect_date_column(list(schema))
+        if date_column is None:
+            raise SchemaError("No date column found; a dataset is partitioned by date")
+        if schema.get(date_column) != 'datetime':
+            raise SchemaError(f"Column '{date_column}' is missing or not a date column")
+        if manifest:
+            expected = manifest['columns']
+            problems = []
+            missing = [col for col in expected if col not in schema]
+            extra = [col for col in schema if col not in expected]
+            if missing:
+                problems.append(f"missing columns: {', '.join(missing)}")
+            if extra:
+                problems.append(f"unexpected columns: {', '.join(extra)}")
+            problems += [f"'{col}' is {schema[col]}, expected {kind}"
+                         for col, kind in expected.items() if col in schema and schema[col] != kind]
+            if problems:
+                raise SchemaError("Schema does not match the dataset: " + "; ".join(problems))
+        return date_column, schema
+
+    def append(self, df):
+        """Tambahkan data baru. Return ringkasan: baris, hari, hari yang diganti, baris tanpa tanggal"""
+        with self._lock:
+            manifest = self.manifest()
+            date_column, schema = self.validate(df, manifest)
+            key_column = day_key_column(date_column)
+            keys = df[key_column].to_numpy() if key_column in df.columns else day_keys(df[date_column])
+
+            valid = keys != NAT_DAY_KEY
+            dropped = int((~valid).sum())
+            order = np.argsort(keys[valid], kind='stable')
+            df = df[valid].iloc[order]
+            keys = keys[valid][order]
+            # Teks selalu disimpan sebagai dictionary supaya tipe partisi seragam antar upload
+            text_columns = [col for col, kind in schema.items() if kind == 'text']
+            df = df.astype({col: 'category' for col in text_columns})
+
+            days, starts = np.unique(keys, return_index=True)
+            ends = np.append(starts[1:], len(keys))
+            day_rows = dict(manifest['days']) if manifest else {}
+            replaced = 0
+            os.makedirs(self._path('parts'), exist_ok=True)
+            for day, lo, hi in zip(days, starts, ends):
+                label = from_day_key(day).isoformat()
+                replaced += label in day_rows
+                part = df.iloc[lo:hi].copy()
+                for col in text_columns:
+                    part[col] = part[col].cat.remove_unused_categories()
+                _write_atomic(self._path('parts', f"{label}.parquet"),
+                              lambda path: part.to_parquet(path, index=False))
+                day_rows[label] = int(hi - lo)
+
+            version = (manifest['version'] if manifest else 0) + 1
+            rollups = dict(manifest.get('rollups', {})) if manifest else {}
+            # Rollup yang sudah ada: hanya hari-hari baru yang diagregasi lalu digabung.
+            # Rollup yang tidak terkini dilewati; `rollup()` membangunnya ulang saat diminta
+            for key, config in rollups.items():
+                previous = self._read_rollup(key, date_column, config, version=version - 1)
+                if previous is not None:
+                    update = RollupCube(df, date_column, *config)
+                    self._write_rollup(key, previous.replace_days(update), version)
+
+            self._write_manifest({
+                'version': version,
+                'updated': time.time(),
+                'date_column': date_column,
+                'columns': manifest['columns'] if manifest else schema,
+                'days': dict(sorted(day_rows.items())),
+                'rollups': rollups,
+            })
+        return {'rows': len(df), 'days': len(days), 'replaced': replaced, 'dropped': dropped, 'version': version}
+
+    def load(self):
+        """Seluruh dataset sebagai satu DataFrame (terurut per tanggal), dibaca paralel per partisi"""
+        manifest = self.manifest()
+        paths = [self._path('parts', f"{label}.parquet") for label in sorted(manifest['days'])]
+        with ThreadPoolExecutor(max_workers=READ_THREADS) as pool:
+            tables = list(pool.map(pq.read_table, paths))
+        # Lebar integer / kamus kategori bisa berbeda antar partisi; disatukan di sini
+        table = pa.concat_tables(tables, promote_options='permissive')
+        df = sort_categories(table.to_pandas())
+        df.attrs['dataset'] = {'version': manifest['version'], 'days': len(paths), 'date_column': manifest['date_column']}
+        return df
+
+    def _rollup_path(self, key):
+        return self._path('rollups', f"{key}.parquet")
+
+    def _read_rollup(self, key, date_column, config, version):
+        """Rollup tersimpan sebagai RollupCube; None jika tidak ada atau bukan untuk `version`"""
+        try:
+            cube = pd.read_parquet(self._rollup_path(key))
+        except (OSError, ValueError):
+            return None
+        if cube.attrs.get('version') != version:
+            return None
+        return RollupCube.from_frame(cube, date_column, *config)
+
+    def _write_rollup(self, key, cube, version):
+        frame = cube.cube.copy(deep=False)
+        frame.attrs = {'version': version}
+        os.makedirs(self._path('rollups'), exist_ok=True)
+        _write_atomic(self._rollup_path(key), lambda path: frame.to_parquet(path, index=False))
+
+    def rollup(self, value_column, category_column, product_column, df):
+        """Cube untuk pilihan kolom ini: dari file rollup jika terkini, jika tidak dibangun dari `df`
+
+        Rollup yang pernah diminta ikut diperbarui pada setiap append berikutnya.
+        """
+        config = [value_column, category_column, product_column]
+        key = content_hash(json.dumps(config, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            manifest = self.manifest()
+            cube = self._read_rollup(key, manifest['date_column'], config, manifest['version'])
+            if cube is None:
+                cube = RollupCube(df, manifest['date_column'], *config)
+                self._write_rollup(key, cube, manifest['version'])
+                if key not in manifest.get('rollups', {}):
+                    manifest.setdefault('rollups', {})[key] = config
+                    self._write_manifest(manifest)
+        return cube
@@ -0,0 +1,67 @@
+"""Downsampling deret waktu di server supaya jumlah titik per trace tetap dalam budget.
+
+Kedua metode mengembalikan index titik yang dipertahankan (titik pertama dan terakhir
+selalu ikut), sehingga bisa dipakai untuk array x/y maupun kolom lain.
+"""
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: pilih satu titik per bucket yang paling menjaga bentuk kurva"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Titik tengah dibagi ke n_out - 2 bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Min dan max per bucket (2 titik per bucket); puncak dan lembah tidak pernah hilang"""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = (n_out - 2) // 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    lengths = np.diff(edges)
+    starts, lengths = starts[lengths > 0], lengths[lengths > 0]
+
+    # argmin/argmax per bucket lewat reduceat pada nilai, lalu cari posisinya
+    mins = np.minimum.reduceat(y[1:n - 1], starts - 1)
+    maxs = np.maximum.reduceat(y[1:n - 1], starts - 1)
+    bucket = np.repeat(np.arange(len(starts)), lengths)
+    positions = np.arange(1, n - 1)
+    values = y[1:n - 1]
+    is_min = values == mins[bucket]
+    is_max = values == maxs[bucket]
+    # Ambil kemunculan pertama per bucket
+    min_idx = np.full(len(starts), -1, dtype=np.int64)
+    max_idx = np.full(len(starts), -1, dtype=np.int64)
+    min_idx[bucket[is_min][::-1]] = positions[is_min][::-1]
+    max_idx[bucket[is_max][::-1]] = positions[is_max][::-1]
+    return np.unique(np.concatenate(([0, n - 1], min_idx, max_idx)))
+
+
+def downsample(x, y, budget, method='lttb'):
+    """Index titik yang dipertahankan agar jumlah titik <= budget"""
+    if method == 'minmax':
+        return minmax_indices(y, budget)
+    return lttb_indices(x, y, budget)
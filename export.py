@@ -0,0 +1,117 @@
+"""Export data terfilter ke CSV / Parquet / XLSX, ditulis per chunk ke disk dan di-cache per state filter."""
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+from ingest import content_hash, is_internal
+
+# format -> (ekstensi, MIME type)
+FORMATS = {
+    'CSV': ('.csv', 'text/csv'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'Excel (XLSX)': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+# Batas baris per sheet Excel (termasuk header)
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df, path, chunk_rows=100_000):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(_chunks(df, chunk_rows)):
+            chunk.to_csv(f, header=i == 0, index=False)
+        if len(df) == 0:
+            df.to_csv(f, index=False)
+
+
+def write_parquet(df, path, chunk_rows=100_000):
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _excel_rows(chunk):
+    """Baris Python untuk openpyxl: NaN/NaT -> sel kosong, categorical -> nilai aslinya"""
+    columns = []
+    for col in chunk.columns:
+        series = chunk[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+        values = series.astype(object).where(series.notna(), None).tolist()
+        columns.append(values)
+    return zip(*columns)
+
+
+def write_xlsx(df, path, chunk_rows=50_000):
+    # Mode write-only: baris langsung di-stream ke file, tanpa menyimpan objek sel di memori
+    wb = Workbook(write_only=True)
+    header = [str(col) for col in df.columns]
+    ws, rows_in_sheet, sheet_no = None, EXCEL_MAX_ROWS, 0
+    for chunk in _chunks(df, chunk_rows):
+        for row in _excel_rows(chunk):
+            if rows_in_sheet >= EXCEL_MAX_ROWS:
+                sheet_no += 1
+                ws = wb.create_sheet(f"Data {sheet_no}" if sheet_no > 1 else "Data")
+                ws.append(header)
+                rows_in_sheet = 1
+            ws.append(row)
+            rows_in_sheet += 1
+    if ws is None:
+        wb.create_sheet("Data").append(header)
+    wb.save(path)
+
+
+WRITERS = {'CSV': write_csv, 'Parquet': write_parquet, 'Excel (XLSX)': write_xlsx}
+
+
+class ExportCache:
+    """File export di disk per (state filter, format); download berulang tidak membuat ulang file"""
+
+    def __init__(self, directory, max_files=20):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, state, fmt):
+        key = content_hash(repr((state, fmt)).encode('utf-8'))
+        return os.path.join(self.directory, f"{key}{FORMATS[fmt][0]}")
+
+    def _evict(self):
+        files = sorted(
+            (entry.stat().st_mtime, entry.path) for entry in os.scandir(self.directory)
+            if entry.is_file() and not entry.name.endswith('.tmp')
+        )
+        for _, path in files[:max(len(files) - self.max_files, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def build(self, df, state, fmt):
+        """Path file export untuk state filter; file hanya ditulis jika belum ada"""
+        path = self.path_for(state, fmt)
+        with self._lock:
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+            data = df.drop(columns=[col for col in df.columns if is_internal(col)])
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            WRITERS[fmt](data, tmp_path)
+            os.replace(tmp_path, path)
+            self._evict()
+        return path
+
+    def read(self, df, state, fmt):
+        with open(self.build(df, state, fmt), 'rb') as f:
+            return f.read()
@@ -0,0 +1,170 @@
+"""Filter engine untuk dashboard: index tanggal terurut dengan range slicing via binary search,
+plus bitmap index per nilai kolom (kategori/produk) untuk filter nilai tanpa frame perantara."""
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from ingest import day_key_column, day_keys
+
+EPOCH = date(1970, 1, 1)
+# Day key untuk NaT (lihat ingest.compact_frame); selalu terurut paling depan
+NAT_DAY_KEY = np.iinfo(np.int32).min
+# Jumlah seleksi (rentang + nilai filter) yang diingat per FilterIndex
+FILTER_MEMO_SIZE = 32
+
+
+def to_day_key(value):
+    """Konversi datetime.date ke integer day key (hari sejak epoch)"""
+    return (value - EPOCH).days
+
+
+def from_day_key(key):
+    return EPOCH + timedelta(days=int(key))
+
+
+class DateIndex:
+    """Frame yang sudah diurutkan sekali berdasarkan kolom tanggal.
+
+    Filter rentang tanggal menjadi `searchsorted` di array day key lalu slice `iloc`
+    (tanpa copy), dan batas min/max tanggal diambil dari ujung array dalam O(1).
+    """
+
+    def __init__(self, df, date_column):
+        key_column = day_key_column(date_column)
+        if key_column not in df.columns:
+            df = df.assign(**{key_column: day_keys(df[date_column])})
+
+        # Stable sort; NaT di depan supaya urutannya sama dengan day key. Frame yang sudah
+        # terurut (mis. frame bersama yang di-memory-map) dipakai apa adanya, tanpa salinan
+        if not df[date_column].is_monotonic_increasing:
+            df = df.sort_values(date_column, kind='stable', na_position='first', ignore_index=True)
+        self.frame = df
+        self.date_column = date_column
+        self.keys = df[key_column].to_numpy()
+        # Baris dengan tanggal valid dimulai setelah semua NaT
+        self._first_valid = int(self.keys.searchsorted(NAT_DAY_KEY, side='right'))
+
+    @property
+    def min_date(self):
+        if self._first_valid >= len(self.keys):
+            return None
+        return from_day_key(self.keys[self._first_valid])
+
+    @property
+    def max_date(self):
+        if self._first_valid >= len(self.keys):
+            return None
+        return from_day_key(self.keys[-1])
+
+    def bounds(self, start_date, end_date):
+        """Posisi baris [lo, hi) untuk rentang tanggal inklusif"""
+        lo = int(self.keys.searchsorted(max(to_day_key(start_date), NAT_DAY_KEY + 1), side='left'))
+        hi = int(self.keys.searchsorted(to_day_key(end_date), side='right'))
+        return lo, max(lo, hi)
+
+    def slice(self, start_date, end_date):
+        """Baris dengan tanggal di antara start_date dan end_date (inklusif), tanpa copy"""
+        lo, hi = self.bounds(start_date, end_date)
+        return self.frame.iloc[lo:hi]
+
+
+class ValueBitmaps:
+    """Posisi baris per nilai satu kolom, dengan container adaptif seperti roaring bitmap.
+
+    Nilai yang sering muncul (lebih dari 1/32 baris) disimpan sebagai bitmap terpaket
+    (n/8 byte), nilai yang jarang sebagai array posisi terurut (4 byte per baris), sehingga
+    index tidak pernah lebih besar dari bitmap atau daftar posisi untuk setiap nilai.
+    """
+
+    def __init__(self, values):
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype('category')
+        codes = values.cat.codes.to_numpy()
+        self.rows = len(codes)
+        self.lookup = {value: code for code, value in enumerate(values.cat.categories)}
+
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.lookup))
+        dense = counts * 32 > self.rows
+        # Bitmap untuk nilai padat: satu baris byte terpaket per nilai
+        self._dense_row = np.full(len(self.lookup), -1)
+        self._dense_row[dense] = np.arange(int(dense.sum()))
+        self._bitmaps = np.array([np.packbits(codes == code) for code in np.flatnonzero(dense)],
+                                 dtype=np.uint8).reshape(-1, (self.rows + 7) >> 3)
+        # Posisi untuk nilai jarang (CSR: posisi terurut per nilai)
+        sparse_rows = np.flatnonzero((codes >= 0) & ~dense[codes])
+        self._positions = sparse_rows[np.argsort(codes[sparse_rows], kind='stable')].astype(np.int32)
+        self._offsets = np.concatenate([[0], np.cumsum(np.where(dense, 0, counts))])
+
+    def mask(self, values, lo, hi):
+        """Mask boolean untuk baris [lo, hi) yang nilainya ada di `values`"""
+        codes = [self.lookup[value] for value in values if value in self.lookup]
+        dense_rows = [self._dense_row[code] for code in codes if self._dense_row[code] >= 0]
+        if dense_rows:
+            # OR di level byte (8 baris per operasi), lalu di-unpack sekali untuk rentang ini
+            first_byte = lo >> 3
+            packed = np.bitwise_or.reduce(self._bitmaps[dense_rows, first_byte:(hi + 7) >> 3], axis=0)
+            offset = lo - first_byte * 8
+            mask = np.unpackbits(packed)[offset:offset + hi - lo].view(bool)
+        else:
+            mask = np.zeros(hi - lo, dtype=bool)
+        for code in codes:
+            if self._dense_row[code] < 0:
+                positions = self._positions[self._offsets[code]:self._offsets[code + 1]]
+                start, stop = positions.searchsorted([lo, hi])
+                mask[positions[start:stop] - lo] = True
+        return mask
+
+
+class FilterIndex:
+    """Filter nilai (kategori, produk, ...) di atas frame tetap, dibagi ke semua sesi.
+
+    Bitmap per kolom dibangun saat kolom pertama kali difilter. Seleksi untuk satu
+    (rentang baris, filter) di-memo (LRU), jadi kembali ke pilihan sebelumnya tidak
+    menghitung ulang mask.
+    """
+
+    def __init__(self, frame, memo_size=FILTER_MEMO_SIZE):
+        self.frame = frame
+        self.memo_size = memo_size
+        self._bitmaps = {}
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bitmaps(self, column):
+        with self._lock:
+            bitmaps = self._bitmaps.get(column)
+        if bitmaps is None:
+            bitmaps = ValueBitmaps(self.frame[column])
+            with self._lock:
+                bitmaps = self._bitmaps.setdefault(column, bitmaps)
+        return bitmaps
+
+    def positions(self, lo, hi, filters):
+        """Posisi baris di [lo, hi) yang lolos semua filter {kolom: nilai}; None jika semua lolos"""
+        key = (lo, hi, frozenset((column, frozenset(values)) for column, values in filters.items()))
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        mask = None
+        for column, values in filters.items():
+            column_mask = self.bitmaps(column).mask(values, lo, hi)
+            mask = column_mask if mask is None else mask & column_mask
+        positions = None
+        if mask is not None and not mask.all():
+            positions = np.flatnonzero(mask) + lo
+        with self._lock:
+            self._memo[key] = positions
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return positions
+
+    def select(self, lo, hi, filters):
+        """Frame untuk rentang baris + filter nilai: satu `take`, atau slice tanpa copy jika semua lolos"""
+        positions = self.positions(lo, hi, filters)
+        if positions is None:
+            return self.frame.iloc[lo:hi]
+        return self.frame.take(positions)
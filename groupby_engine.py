@@ -0,0 +1,160 @@
+"""Engine groupby berbasis integer codes: key di-factorize sekali, agregasi lewat np.bincount.
+
+Dipakai sebagai pengganti `DataFrame.groupby(...).sum()` di dashboard. Key yang bukan
+categorical / integer / boolean (mis. kolom teks biasa) otomatis memakai pandas groupby.
+"""
+import numpy as np
+import pandas as pd
+
+# Batas jumlah kombinasi key untuk indexing padat; di atas ini kombinasi di-factorize ulang
+DENSE_LIMIT = 50_000_000
+# Indexing padat juga dibatasi jumlah baris: array bincount paling banyak sekian kali jumlah
+# baris (atau DENSE_MIN_GROUPS), supaya kombinasi jarang tidak mengalokasikan array raksasa
+DENSE_ROW_FACTOR = 4
+DENSE_MIN_GROUPS = 65_536
+
+
+def supports(series):
+    """True jika kolom bisa dipakai sebagai key di engine (tanpa hashing string)"""
+    dtype = series.dtype
+    return isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_integer_dtype(dtype) \
+        or pd.api.types.is_bool_dtype(dtype)
+
+
+def key_codes(series):
+    """Factorize satu kolom key. Return (codes, labels); codes -1 untuk nilai kosong"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Categorical sudah menyimpan codes padat + kamus; tanpa biaya tambahan
+        return series.cat.codes.to_numpy().astype(np.int64), series.cat.categories
+    values = series.to_numpy()
+    if pd.api.types.is_integer_dtype(values.dtype) and len(values):
+        lo, hi = int(values.min()), int(values.max())
+        if hi - lo < max(4 * len(values), 1024):
+            return values.astype(np.int64) - lo, pd.Index(np.arange(lo, hi + 1, dtype=values.dtype))
+    codes, labels = pd.factorize(series, sort=True)
+    return codes.astype(np.int64), pd.Index(labels)
+
+
+def top_k(values, k):
+    """Index k nilai terbesar (terurut menurun) dengan partial selection"""
+    values = np.asarray(values)
+    if k >= len(values):
+        return np.argsort(-values, kind='stable')
+    part = np.argpartition(-values, k)[:k]
+    return part[np.argsort(-values[part], kind='stable')]
+
+
+class GroupIndex:
+    """Codes gabungan untuk satu set kolom key, dipakai berulang untuk banyak agregasi"""
+
+    def __init__(self, keys, dropna=True):
+        self.names = [key.name for key in keys]
+        self._categorical = [isinstance(key.dtype, pd.CategoricalDtype) for key in keys]
+        codes_list, self.labels, sizes = [], [], []
+        valid = np.ones(len(keys[0]), dtype=bool)
+        for key in keys:
+            codes, labels = key_codes(key)
+            missing = codes < 0
+            size = len(labels)
+            if missing.any():
+                if dropna:
+                    valid &= ~missing
+                else:
+                    # Nilai kosong menjadi grup tambahan setelah label terakhir
+                    codes = np.where(missing, size, codes)
+                    size += 1
+            codes_list.append(codes)
+            self.labels.append(labels)
+            sizes.append(size)
+
+        self.valid = None if valid.all() else valid
+        combined = codes_list[0] if len(codes_list) == 1 else \
+            np.ravel_multi_index(codes_list, sizes, mode='clip')
+        if self.valid is not None:
+            combined = combined[self.valid]
+
+        n_groups = np.prod(sizes, dtype=np.float64)
+        if n_groups <= DENSE_LIMIT and n_groups <= max(DENSE_ROW_FACTOR * len(combined), DENSE_MIN_GROUPS):
+            self.codes, self.n_groups, self._dense_ids = combined, int(np.prod(sizes)), None
+        else:
+            # Ruang kombinasi terlalu besar untuk bincount; padatkan dulu (terurut)
+            self.codes, self._dense_ids = pd.factorize(combined, sort=True)
+            self.n_groups = len(self._dense_ids)
+        self._sizes = sizes
+
+    def _values(self, values):
+        values = np.asarray(values)
+        return values if self.valid is None else values[self.valid]
+
+    def size(self):
+        return np.bincount(self.codes, minlength=self.n_groups)
+
+    def sum(self, values):
+        values = self._values(values)
+        is_integer = values.dtype.kind in 'iub'
+        weights = values.astype(np.float64)
+        notna = ~np.isnan(weights)
+        if notna.all():
+            result = np.bincount(self.codes, weights=weights, minlength=self.n_groups)
+        else:
+            result = np.bincount(self.codes[notna], weights=weights[notna], minlength=self.n_groups)
+        return np.rint(result).astype(np.int64) if is_integer else result
+
+    def count(self, values):
+        notna = ~pd.isna(self._values(values))
+        return np.bincount(self.codes[notna], minlength=self.n_groups)
+
+    def mean(self, values):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sum(values) / self.count(values)
+
+    def group_codes(self, groups):
+        """Codes per kolom key untuk nomor grup tertentu (urutan codes = urutan label)"""
+        ids = groups if self._dense_ids is None else self._dense_ids[groups]
+        return np.unravel_index(ids, self._sizes)
+
+    def key_frame(self, groups):
+        """Label key untuk nomor grup tertentu (categorical tetap categorical)"""
+        parts = self.group_codes(groups)
+        columns = {}
+        for name, codes, labels, categorical in zip(self.names, parts, self.labels, self._categorical):
+            codes = np.where(codes >= len(labels), -1, codes)
+            if categorical:
+                columns[name] = pd.Categorical.from_codes(codes, categories=labels)
+            elif (codes < 0).any():
+                columns[name] = labels.take(codes, allow_fill=True)
+            else:
+                columns[name] = labels.take(codes)
+        return pd.DataFrame(columns)
+
+
+def aggregate(df, keys, sums=None, counts=None, size=None, dropna=True):
+    """Groupby multi-key: `sums`/`counts` adalah {nama_output: kolom_input}, `size` nama kolom jumlah baris.
+
+    Hasil hanya berisi grup yang muncul (observed), terurut per key, dengan kolom key di depan.
+    """
+    sums, counts = sums or {}, counts or {}
+    if not all(supports(df[key]) for key in keys):
+        return _aggregate_pandas(df, keys, sums, counts, size, dropna)
+
+    index = GroupIndex([df[key] for key in keys], dropna=dropna)
+    rows = index.size()
+    observed = np.flatnonzero(rows)
+    result = index.key_frame(observed)
+    for name, column in sums.items():
+        result[name] = index.sum(df[column])[observed]
+    for name, column in counts.items():
+        result[name] = index.count(df[column])[observed]
+    if size:
+        result[size] = rows[observed]
+    return result
+
+
+def _aggregate_pandas(df, keys, sums, counts, size, dropna):
+    """Fallback pandas groupby dengan hasil yang sama bentuknya"""
+    aggs = {name: (column, 'sum') for name, column in sums.items()}
+    aggs.update({name: (column, 'count') for name, column in counts.items()})
+    if size:
+        aggs[size] = (keys[0], 'size')
+    grouped = df.groupby(keys, observed=True, dropna=dropna, sort=True)
+    return grouped.agg(**aggs).reset_index()
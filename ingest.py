@@ -0,0 +1,634 @@
+"""Ingest layer: parsing file upload sekali, lalu simpan hasilnya per content hash."""
+import glob
+import hashlib
+import io
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+# Kolom internal (mis. day key) diawali prefix ini dan disembunyikan dari UI/export
+INTERNAL_PREFIX = '__'
+
+# Kata kunci untuk mendeteksi kolom tanggal (English, Indonesia, 中文)
+DATE_KEYWORDS = ('date', 'tanggal', '日期')
+
+# Kolom bobot pada data pra-agregasi (hasil streaming): jumlah baris asli per grup
+ROWS_COLUMN = f"{INTERNAL_PREFIX}rows"
+
+
+def content_hash(data):
+    """Hash isi file (bukan nama file) sebagai key cache"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def clean_columns(df):
+    """Bersihkan nama kolom: strip spasi dan ganti spasi dengan underscore"""
+    df.columns = [str(col).strip().replace(' ', '_') for col in df.columns]
+    return df
+
+
+def detect_date_column(columns):
+    """Kolom tanggal pertama berdasarkan nama kolom, atau None"""
+    date_cols = [col for col in columns if any(k in col.lower() for k in DATE_KEYWORDS)]
+    return date_cols[0] if date_cols else None
+
+
+def parse_dates(df):
+    """Konversi kolom tanggal pertama yang terdeteksi ke datetime64"""
+    date_column = detect_date_column(df.columns)
+    if date_column:
+        df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
+    return df
+
+
+def day_key_column(date_column):
+    """Nama kolom integer day key untuk sebuah kolom tanggal"""
+    return f"{INTERNAL_PREFIX}day_{date_column}"
+
+
+def count_column(column):
+    """Nama kolom jumlah nilai non-null untuk kolom numerik pada data pra-agregasi"""
+    return f"{INTERNAL_PREFIX}count_{column}"
+
+
+def day_keys(series):
+    """Integer day key (hari sejak epoch, int32) untuk kolom datetime; NaT -> minimum int32"""
+    if series.dt.tz is not None:
+        series = series.dt.tz_localize(None)
+    values = series.to_numpy()
+    days = values.astype('datetime64[D]').astype(np.int64)
+    days[np.isnat(values)] = np.iinfo(np.int32).min
+    return days.astype(np.int32)
+
+
+def is_internal(column):
+    """True untuk kolom internal yang tidak ditampilkan ke pengguna"""
+    return str(column).startswith(INTERNAL_PREFIX)
+
+
+def _float_is_lossless(values):
+    as32 = values.astype(np.float32)
+    with np.errstate(invalid='ignore', over='ignore'):
+        return np.array_equal(as32.astype(np.float64), values, equal_nan=True)
+
+
+def compact_frame(df, category_ratio=0.5, max_categories=100_000, downcast=True):
+    """Kompaksi DataFrame saat ingest supaya hemat memori dan cepat di-filter/groupby.
+
+    - kolom teks dengan kardinalitas rendah/menengah -> dtype `category`
+    - integer dan float di-downcast hanya jika lossless (bisa dimatikan dengan `downcast=False`)
+    - setiap kolom datetime64 mendapat kolom integer day key (hari sejak epoch, int32)
+
+    Ringkasan memori sebelum/sesudah disimpan di `df.attrs['compaction']`.
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    n_rows = max(len(df), 1)
+    converted = []
+
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype) or is_internal(col):
+            continue
+        if dtype == object or pd.api.types.is_string_dtype(dtype):
+            n_unique = series.nunique(dropna=True)
+            if n_unique <= max_categories and n_unique / n_rows <= category_ratio:
+                df[col] = series.astype('category')
+                converted.append(col)
+        elif downcast and pd.api.types.is_integer_dtype(dtype) and dtype.kind in 'iu':
+            df[col] = pd.to_numeric(series, downcast='integer' if dtype.kind == 'i' else 'unsigned')
+        elif downcast and pd.api.types.is_float_dtype(dtype) and dtype == np.float64:
+            if _float_is_lossless(series.to_numpy()):
+                df[col] = series.astype(np.float32)
+
+    # Day key per kolom tanggal: NaT menjadi nilai minimum int32
+    for col in df.select_dtypes(include=['datetime64']).columns:
+        if is_internal(col):
+            continue
+        df[day_key_column(col)] = day_keys(df[col])
+
+    after = int(df.memory_usage(deep=True).sum())
+    df.attrs['compaction'] = {
+        'before_mb': before / 1024 ** 2,
+        'after_mb': after / 1024 ** 2,
+        'categorical': converted,
+    }
+    return df
+
+
+def parse_file(name, data, sheet=None, columns=None):
+    """Parse bytes file upload (CSV / Excel) menjadi DataFrame yang sudah dibersihkan
+
+    `sheet` dan `columns` (nama kolom setelah dibersihkan) hanya berlaku untuk Excel.
+    """
+    buffer = io.BytesIO(data)
+    if name.lower().endswith('.csv'):
+        df = pd.read_csv(buffer)
+    elif name.lower().endswith(OPENPYXL_EXTENSIONS):
+        df = read_excel_fast(buffer, sheet=sheet, columns=columns)
+    else:
+        # .xls (format biner lama) tidak didukung openpyxl
+        df = clean_columns(pd.read_excel(buffer, sheet_name=sheet or 0))
+        if columns is not None:
+            df = df[list(columns)]
+    clean_columns(df)
+    parse_dates(df)
+    return df
+
+
+# ==================== EXCEL (openpyxl read-only) ====================
+# Format yang dibaca langsung dengan openpyxl; .xls lewat pd.read_excel
+OPENPYXL_EXTENSIONS = ('.xlsx', '.xlsm')
+# Baris per blok: nilai Python hanya hidup selama satu blok sebelum dikonversi ke array bertipe
+EXCEL_BLOCK_ROWS = 10_000
+
+
+def _header_names(row):
+    """Nama kolom dari baris header (sudah dibersihkan); sel kosong -> Unnamed_<i>, duplikat -> <nama>.1"""
+    names = []
+    seen = {}
+    for i, value in enumerate(row):
+        name = f"Unnamed_{i}" if value is None or str(value).strip() == '' else str(value).strip().replace(' ', '_')
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+def _open_workbook(source):
+    from openpyxl import load_workbook
+
+    return load_workbook(source, read_only=True, data_only=True, keep_links=False)
+
+
+def excel_layout(source):
+    """{nama sheet: daftar kolom} dari baris pertama setiap sheet, tanpa membaca isi sheet"""
+    workbook = _open_workbook(source)
+    try:
+        layout = {}
+        for worksheet in workbook.worksheets:
+            header = next(worksheet.iter_rows(max_row=1, values_only=True), ())
+            layout[worksheet.title] = _header_names(header)
+        return layout
+    finally:
+        workbook.close()
+
+
+def read_excel_fast(source, sheet=None, columns=None, block_rows=EXCEL_BLOCK_ROWS):
+    """Baca satu sheet Excel dengan openpyxl read-only + values_only.
+
+    Baris pertama adalah header. Hanya kolom di `columns` (nama setelah dibersihkan; None =
+    semua) yang diambil dari setiap baris, dan baris dikonversi per blok ke kolom bertipe,
+    sehingga memori sebanding dengan hasil, bukan dengan jumlah sel workbook.
+    """
+    workbook = _open_workbook(source)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        # Dimensi yang ditulis sebagian aplikasi tidak akurat; hitung ulang dari isi sheet
+        worksheet.reset_dimensions()
+        rows = worksheet.iter_rows(values_only=True)
+        names = _header_names(next(rows, ()))
+        if columns is None:
+            positions = list(range(len(names)))
+        else:
+            missing = [col for col in columns if col not in names]
+            if missing:
+                raise KeyError(f"Columns not found in sheet: {', '.join(missing)}")
+            positions = [names.index(col) for col in columns]
+        names = [names[i] for i in positions]
+        width = max(positions, default=-1) + 1
+
+        blocks = []
+        block = []
+        for row in rows:
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            block.append([row[i] for i in positions])
+            if len(block) >= block_rows:
+                blocks.append(pd.DataFrame.from_records(block, columns=names))
+                block = []
+        if block or not blocks:
+            blocks.append(pd.DataFrame.from_records(block, columns=names))
+    finally:
+        workbook.close()
+
+    df = pd.concat(blocks, ignore_index=True) if len(blocks) > 1 else blocks[0]
+    # Baris kosong di akhir sheet (sel terformat tanpa nilai) dibuang
+    filled = df.notna().any(axis=1).to_numpy()
+    if len(filled) and not filled[-1]:
+        df = df.iloc[:np.flatnonzero(filled)[-1] + 1 if filled.any() else 0]
+    return df
+
+
+# ==================== STREAMING CSV ====================
+# Key grup tunggal jika file tidak punya kolom tanggal maupun dimensi
+_ALL_KEY = f"{INTERNAL_PREFIX}all"
+
+
+def _detect_layout(chunk):
+    """Tentukan kolom tanggal, dimensi (kategori, produk) dan kolom numerik dari chunk pertama"""
+    date_column = detect_date_column(chunk.columns)
+    numeric = [col for col in chunk.select_dtypes(include=[np.number]).columns if col != date_column]
+    text_cols = [col for col in chunk.columns if col != date_column and col not in numeric]
+    n_rows = max(len(chunk), 1)
+    unique = {col: chunk[col].nunique() for col in text_cols}
+
+    # Aturan sama dengan auto-detect di sidebar: kategori < 20 nilai unik, produk kardinalitas menengah
+    category = next((col for col in text_cols if 1 < unique[col] < 20), None)
+    product = next((col for col in text_cols if col != category and unique[col] / n_rows <= 0.5), None)
+    return {
+        'date': date_column,
+        'dims': [col for col in (category, product) if col],
+        'numeric': numeric,
+    }
+
+
+def _coerce_chunk(chunk, layout):
+    """Samakan tipe data setiap chunk dengan layout dari chunk pertama"""
+    if layout['date']:
+        chunk[layout['date']] = pd.to_datetime(chunk[layout['date']], errors='coerce')
+    for col in layout['numeric']:
+        if not pd.api.types.is_numeric_dtype(chunk[col]):
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+    for col in layout['dims']:
+        chunk[col] = chunk[col].astype(object)
+    return chunk
+
+
+def _aggregate_chunk(chunk, layout):
+    """Agregasi satu chunk ke grain harian x dimensi: sum, count, dan jumlah baris"""
+    keys = []
+    if layout['date']:
+        keys.append(chunk[layout['date']].dt.floor('D'))
+    keys.extend(chunk[col] for col in layout['dims'])
+    if not keys:
+        keys.append(pd.Series(0, index=chunk.index, name=_ALL_KEY))
+
+    grouped = chunk[layout['numeric']].groupby(keys, dropna=False, sort=False)
+    result = grouped.sum(min_count=0)
+    counts = grouped.count()
+    counts.columns = [count_column(col) for col in counts.columns]
+    result = result.join(counts)
+    result[ROWS_COLUMN] = grouped.size()
+    return result
+
+
+def _fold(partials):
+    """Gabungkan beberapa agregat parsial; semua kolom agregat bisa dijumlahkan"""
+    combined = pd.concat(partials)
+    return combined.groupby(level=list(range(combined.index.nlevels)), dropna=False, sort=False).sum()
+
+
+def stream_csv(source, store_dir=None, chunk_rows=500_000, progress=None, fold_every=8):
+    """Baca CSV per chunk dan lipat setiap chunk ke agregat harian, tanpa memuat seluruh file.
+
+    Setiap chunk dibersihkan (nama kolom, tanggal, tipe data), ditulis ke `store_dir` sebagai
+    file Parquet (`part-00000.parquet`, ...) jika diberikan, lalu diagregasi. Hasilnya berupa
+    DataFrame pra-agregasi dengan kolom tanggal (harian), dimensi, sum kolom numerik, serta
+    kolom internal jumlah nilai (`count_column`) dan jumlah baris (`ROWS_COLUMN`).
+
+    `progress(rows, position)` dipanggil setelah setiap chunk; `position` adalah posisi byte
+    di `source` jika tersedia.
+    """
+    if store_dir:
+        os.makedirs(store_dir, exist_ok=True)
+    layout = None
+    partials = []
+    total_rows = 0
+
+    for i, chunk in enumerate(pd.read_csv(source, chunksize=chunk_rows)):
+        clean_columns(chunk)
+        if layout is None:
+            layout = _detect_layout(chunk)
+        _coerce_chunk(chunk, layout)
+        if store_dir:
+            chunk.to_parquet(os.path.join(store_dir, f"part-{i:05d}.parquet"), index=False)
+
+        partials.append(_aggregate_chunk(chunk, layout))
+        # Lipat agregat parsial secara berkala supaya memori tetap terbatas
+        if len(partials) >= fold_every:
+            partials = [_fold(partials)]
+
+        total_rows += len(chunk)
+        if progress is not None:
+            progress(total_rows, source.tell() if hasattr(source, 'tell') else None)
+
+    if layout is None:
+        return pd.DataFrame()
+    result = _fold(partials).reset_index().drop(columns=[_ALL_KEY], errors='ignore')
+    result.attrs['streaming'] = {'rows': total_rows, 'date': layout['date'], 'dims': layout['dims']}
+    return result
+
+
+# ==================== MULTI-FILE ====================
+# Ekstensi file yang diambil dari folder / glob lokal
+SOURCE_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+
+def expand_sources(pattern):
+    """Daftar path file data dari sebuah folder atau pola glob (terurut)"""
+    pattern = os.path.expanduser(pattern)
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*')
+    return sorted(
+        path for path in glob.glob(pattern, recursive=True)
+        if os.path.isfile(path) and path.lower().endswith(SOURCE_EXTENSIONS)
+    )
+
+
+def source_label(name):
+    """Nama sumber untuk kolom Store: nama (relatif) file tanpa ekstensi"""
+    return os.path.splitext(name)[0].replace(os.sep, '/')
+
+
+def source_fingerprint(name, payload):
+    """Key cache satu sumber: hash isi untuk bytes, ukuran + mtime untuk path lokal"""
+    if isinstance(payload, (bytes, bytearray)):
+        return content_hash(payload)
+    stat = os.stat(payload)
+    return f"{os.path.abspath(payload)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _parse_source(name, payload, prepare=None):
+    """Worker: parse satu file (bytes atau path). Return (name, df, error, detik)"""
+    start = time.perf_counter()
+    try:
+        if not isinstance(payload, (bytes, bytearray)):
+            with open(payload, 'rb') as f:
+                payload = f.read()
+        df = parse_file(name, payload)
+        if prepare is not None:
+            df = prepare(df)
+        return name, df, None, time.perf_counter() - start
+    except Exception as e:
+        return name, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def sort_categories(df):
+    """Urutkan kamus setiap kolom category (label alfabetis = urutan codes); hanya codes yang dipetakan ulang"""
+    for col in df.columns:
+        categories = df[col].cat.categories if isinstance(df[col].dtype, pd.CategoricalDtype) else None
+        if categories is None or categories.is_monotonic_increasing:
+            continue
+        try:
+            df[col] = df[col].cat.reorder_categories(categories.sort_values())
+        except TypeError:
+            # Kamus dengan tipe campuran tidak bisa diurutkan
+            continue
+    return df
+
+
+def concat_frames(frames):
+    """Gabungkan frame dengan skema berbeda; kolom category tetap category (kategori digabung)"""
+    columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+    categorical = {}
+    for col in columns:
+        present = [frame[col] for frame in frames if col in frame.columns]
+        # Kolom teks yang hanya di sebagian file menjadi category (kardinalitas tinggi) ikut category
+        is_category = [isinstance(series.dtype, pd.CategoricalDtype) for series in present]
+        if any(is_category) and all(
+            flag or series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+            for flag, series in zip(is_category, present)
+        ):
+            present = [series if flag else series.astype('category') for flag, series in zip(is_category, present)]
+            categories = pd.Index(pd.unique(np.concatenate([series.cat.categories.to_numpy(object) for series in present])))
+            categorical[col] = pd.CategoricalDtype(categories)
+
+    aligned = []
+    for frame in frames:
+        frame = frame.copy(deep=False)
+        for col, dtype in categorical.items():
+            if col in frame.columns:
+                frame[col] = frame[col].astype('category').cat.set_categories(dtype.categories)
+            else:
+                frame[col] = pd.Categorical.from_codes(np.full(len(frame), -1), dtype=dtype)
+        aligned.append(frame.reindex(columns=columns))
+    return sort_categories(pd.concat(aligned, ignore_index=True))
+
+
+def parse_many(sources, executor=None, prepare=None, progress=None):
+    """Parse banyak file sekaligus di process pool dan gabungkan menjadi satu DataFrame.
+
+    `sources` adalah daftar (nama, bytes atau path). Setiap file di-parse (dan di-`prepare`)
+    di worker terpisah; hasilnya disatukan ke skema bersama dengan kolom sumber berisi nama
+    file (`Store`, atau `Source` jika data sudah punya kolom `Store`). File yang gagal tidak
+    menggagalkan batch. Ringkasan per file ada di `df.attrs['sources']`; jika `prepare`
+    adalah `compact_frame`, `df.attrs['compaction']` merangkum memori semua file sebelum
+    kompaksi dan memori frame gabungan sesudahnya.
+
+    `progress(done, total, name, error)` dipanggil setiap kali satu file selesai.
+    """
+    results = [None] * len(sources)
+    done = 0
+    if executor is None or len(sources) == 1:
+        for i, (name, payload) in enumerate(sources):
+            results[i] = _parse_source(name, payload, prepare)
+            done += 1
+            if progress is not None:
+                progress(done, len(sources), name, results[i][2])
+    else:
+        futures = {executor.submit(_parse_source, name, payload, prepare): i
+                   for i, (name, payload) in enumerate(sources)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            done += 1
+            if progress is not None:
+                name, _, error, _ = results[futures[future]]
+                progress(done, len(sources), name, error)
+
+    frames = []
+    summary = []
+    for name, df, error, seconds in results:
+        summary.append({'file': name, 'rows': None if df is None else len(df), 'seconds': seconds, 'error': error})
+        if df is not None:
+            frames.append((name, df))
+    if not frames:
+        raise ValueError("; ".join(f"{item['file']}: {item['error']}" for item in summary))
+
+    compactions = [df.attrs.get('compaction') for _, df in frames]
+    source_column = 'Source' if any('Store' in df.columns for _, df in frames) else 'Store'
+    labels = pd.Index(pd.unique(np.array([source_label(name) for name, _ in frames], dtype=object)))
+    for name, df in frames:
+        df[source_column] = pd.Categorical.from_codes(
+            np.full(len(df), labels.get_loc(source_label(name))), categories=labels
+        )
+    df = concat_frames([df for _, df in frames])
+    df.attrs['sources'] = summary
+    if all(compactions):
+        df.attrs['compaction'] = {
+            'before_mb': sum(item['before_mb'] for item in compactions),
+            'after_mb': int(df.memory_usage(deep=True).sum()) / 1024 ** 2,
+            'categorical': [col for col in dict.fromkeys(c for item in compactions for c in item['categorical'])
+                            if isinstance(df[col].dtype, pd.CategoricalDtype)],
+        }
+    return df
+
+
+class IngestCache:
+    """Cache dua tingkat untuk hasil parsing: memori (per proses) dan Parquet di disk.
+
+    Kedua tingkat memakai LRU eviction dengan budget ukuran dalam byte. Dengan `shared`
+    (`shared_frames.SharedFrames`), tingkat memori diganti frame Arrow yang di-memory-map
+    dan dibagi ke semua proses.
+    """
+
+    def __init__(self, cache_dir, max_disk_bytes, max_memory_bytes, prepare=None, prepare_key='', shared=None):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        # Langkah setelah parsing (mis. compact_frame); prepare_key membedakan konfigurasinya di key cache
+        self.prepare = prepare
+        self.prepare_key = prepare_key
+        self.shared = shared
+        self._memory = OrderedDict()  # key -> (df, nbytes)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def _remember(self, key, df):
+        """Simpan di tingkat memori; return frame yang sebaiknya dipakai (frame bersama jika ada)"""
+        if self.shared is not None:
+            date_column = detect_date_column(df.columns)
+            if date_column is not None and not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+                date_column = None
+            try:
+                self.shared.put(key, df, sort_by=date_column)
+                shared = self.shared.get(key)
+                if shared is not None:
+                    return shared
+            except (ValueError, TypeError, OSError):
+                # Kolom dengan tipe campuran tidak bisa dikonversi ke Arrow; pakai cache memori biasa
+                pass
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.max_memory_bytes:
+            return df
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[1]
+            self._memory[key] = (df, nbytes)
+            self._memory_bytes += nbytes
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted
+        return df
+
+    def _evict_disk(self):
+        # LRU berdasarkan mtime; file di-touch setiap kali cache hit
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.parquet'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+            # Store Parquet per chunk milik hasil streaming ikut dihapus
+            key = os.path.basename(path)[:-len('.parquet')]
+            shutil.rmtree(os.path.join(self.cache_dir, 'streams', key), ignore_errors=True)
+
+    def get(self, key):
+        """Ambil DataFrame dari cache. Return (df, tier) dengan tier 'shared', 'memory', 'disk' atau None"""
+        if self.shared is not None:
+            df = self.shared.get(key)
+            if df is not None:
+                return df.copy(deep=False), 'shared'
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                self._memory.move_to_end(key)
+                # Shallow copy supaya penambahan kolom di satu sesi tidak bocor ke sesi lain
+                return hit[0].copy(deep=False), 'memory'
+
+        path = self._path(key)
+        if os.path.exists(path):
+            try:
+                df = pd.read_parquet(path)
+                os.utime(path)
+            except (OSError, ValueError):
+                return None, None
+            df = self._remember(key, df)
+            return df.copy(deep=False), 'disk'
+        return None, None
+
+    def put(self, key, df):
+        """Simpan DataFrame ke memori dan ke disk (Parquet). Return frame dari tingkat memori"""
+        cached = self._remember(key, df)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=True)
+            os.replace(tmp_path, path)
+        except Exception:
+            # Kolom dengan tipe campuran tidak bisa ditulis ke Parquet; cukup cache di memori
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return cached
+        self._evict_disk()
+        return cached
+
+    def load(self, name, data, parse=None, variant='', digest=None):
+        """Parse file sekali per content hash. Return (df, info) untuk panel debug
+
+        `parse(name, data, key)` menggantikan parse_file (mis. untuk streaming); `variant`
+        membedakan hasil parser lain untuk file yang sama di key cache. `digest` adalah
+        `content_hash(data)` yang sudah dihitung sebelumnya, supaya file besar tidak di-hash ulang.
+        """
+        key = digest or content_hash(data)
+        if self.prepare_key or variant:
+            key = f"{key}-{content_hash((self.prepare_key + variant).encode('utf-8'))[:8]}"
+        return self._load(key, lambda: parse(name, data, key) if parse is not None else parse_file(name, data))
+
+    def load_many(self, sources, parse, digests=None):
+        """Seperti `load` untuk sekumpulan file; key dari nama + fingerprint setiap sumber
+
+        `parse(sources)` mengembalikan satu DataFrame gabungan (mis. `parse_many`) dan sudah
+        menjalankan `prepare` per file di worker, jadi `prepare` cache tidak diulang di sini.
+        `digests` (opsional, sejajar dengan `sources`) berisi fingerprint yang sudah dihitung.
+        """
+        digests = digests or [None] * len(sources)
+        parts = [f"{name}={digest or source_fingerprint(name, payload)}"
+                 for (name, payload), digest in zip(sources, digests)]
+        key = content_hash("\n".join(parts + [self.prepare_key]).encode('utf-8'))
+        return self._load(f"{key}-many", lambda: parse(sources), prepare=False)
+
+    def _load(self, key, build, prepare=True):
+        start = time.perf_counter()
+        df, tier = self.get(key)
+        if df is None:
+            df = build()
+            if prepare and self.prepare is not None:
+                df = self.prepare(df)
+            df = self.put(key, df).copy(deep=False)
+        info = {
+            'key': key,
+            'status': f"HIT ({tier})" if tier else "MISS",
+            'seconds': time.perf_counter() - start,
+        }
+        return df, info
+
+    def stats(self):
+        """Ringkasan isi cache untuk panel debug"""
+        disk_files = [e for e in os.scandir(self.cache_dir) if e.name.endswith('.parquet')]
+        return {
+            'memory_items': len(self._memory),
+            'memory_mb': self._memory_bytes / 1024 ** 2,
+            'disk_items': len(disk_files),
+            'disk_mb': sum(e.stat().st_size for e in disk_files) / 1024 ** 2,
+        }
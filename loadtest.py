@@ -0,0 +1,169 @@
+"""Load test: N sesi bersamaan menjalankan supermarket.py lewat `streamlit.testing.v1.AppTest`.
+
+Setiap sesi menjalankan skenario yang sama: buka dashboard, upload CSV, ubah rentang
+tanggal, toggle kategori, cari produk, pindah section dan ganti bahasa (diulang
+`--iterations` kali). Latensi setiap rerun dicatat; hasilnya p50/p95/p99 per langkah.
+
+Setiap sesi berjalan di prosesnya sendiri: AppTest memasang runtime tiruan global per run,
+jadi beberapa AppTest tidak bisa berjalan bersamaan dalam satu proses. Cache ingest di disk
+tetap dipakai bersama (seperti beberapa worker server), cache di memori tidak.
+RSS per sesi = puncak RSS proses selama skenario, di atas RSS setelah import.
+
+    python loadtest.py --sessions 8 --rows 200000 --iterations 3 -o loadtest.json
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmark import PeakMemory, make_dataset
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "supermarket.py")
+LANGUAGES = ['English', 'Bahasa Indonesia', '中文']
+SECTIONS = ['overview', 'categories', 'products_tab', 'timeseries']
+
+
+def make_upload(rows, seed):
+    data = make_dataset(rows, seed=seed)
+    buffer = io.BytesIO()
+    data.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _language_select(at):
+    return next(s for s in at.selectbox if '中文' in s.options)
+
+
+def run_session(session_id, upload, iterations, timeout):
+    """Jalankan skenario satu sesi. Return daftar (langkah, detik, error)"""
+    from streamlit.testing.v1 import AppTest
+
+    timings = []
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def step(name, action=None):
+        start = time.perf_counter()
+        error = None
+        try:
+            if action is not None:
+                action()
+            at.run()
+            if at.exception:
+                error = at.exception[0].value
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        timings.append((name, time.perf_counter() - start, error))
+
+    step("initial")
+    step("upload", lambda: at.file_uploader[0].set_value((f"session_{session_id}.csv", upload, "text/csv")))
+    rng = np.random.default_rng(session_id)
+    for i in range(iterations):
+        if at.date_input:
+            widget = at.date_input[0]
+            lo, hi = widget.min, widget.max
+            span = (hi - lo).days
+            start = lo + (hi - lo) * float(rng.uniform(0, 0.5))
+            step("date_range", lambda: widget.set_value((start, start + (hi - lo) * 0.25 if span else hi)))
+        if at.multiselect:
+            categories = at.multiselect[0]
+            option = categories.options[int(rng.integers(len(categories.options)))]
+            if option in categories.value and len(categories.value) > 1:
+                step("toggle_category", lambda: categories.unselect(option))
+            else:
+                step("toggle_category", lambda: categories.select(option))
+        if at.text_input:
+            step("search_product", lambda: at.text_input[0].input(f"sku-{int(rng.integers(1, 9)):03d}"))
+        if at.radio:
+            section = at.radio(key="active_section")
+            step("switch_section", lambda: section.set_value(SECTIONS[(i + 1) % len(SECTIONS)]))
+        step("switch_language", lambda: _language_select(at).set_value(LANGUAGES[(i + 1) % len(LANGUAGES)]))
+    return timings
+
+
+def _process_session(args):
+    """Worker: jalankan satu sesi dan ukur RSS-nya"""
+    from streamlit.testing.v1 import AppTest  # noqa: F401 (import dihitung sebagai baseline RSS)
+
+    with PeakMemory(interval=0.02) as memory:
+        timings = run_session(*args)
+    return timings, memory.start_mb, memory.peak_mb
+
+
+def percentiles(values):
+    values = np.asarray(values) * 1000
+    return {
+        'count': len(values),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max()),
+    }
+
+
+def summarize(all_timings):
+    by_step = {}
+    for timings in all_timings:
+        for name, seconds, _ in timings:
+            by_step.setdefault(name, []).append(seconds)
+    report = {name: percentiles(values) for name, values in by_step.items()}
+    report['ALL'] = percentiles([seconds for timings in all_timings for _, seconds, _ in timings])
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for supermarket.py")
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=100_000, help="Rows in the uploaded CSV")
+    parser.add_argument('--iterations', type=int, default=3, help="Times each session repeats the interactions")
+    parser.add_argument('--unique-uploads', action='store_true',
+                        help="Give every session its own file (no shared ingest cache hits)")
+    parser.add_argument('--timeout', type=float, default=300, help="Timeout per rerun (seconds)")
+    parser.add_argument('-o', '--output', help="Write the report as JSON")
+    args = parser.parse_args()
+
+    # Cache ingest terpisah supaya hasil tidak dipengaruhi file cache dari run sebelumnya
+    os.environ.setdefault("SUPERMARKET_CACHE_DIR", tempfile.mkdtemp(prefix="supermarket-loadtest-"))
+
+    shared_upload = None if args.unique_uploads else make_upload(args.rows, seed=42)
+    uploads = [make_upload(args.rows, seed=42 + i) if args.unique_uploads else shared_upload
+               for i in range(args.sessions)]
+    jobs = [(i, uploads[i], args.iterations, args.timeout) for i in range(args.sessions)]
+    print(f"{args.sessions} sessions on {os.cpu_count()} CPUs, {args.rows:,} rows upload, "
+          f"{args.iterations} iterations", flush=True)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.sessions) as pool:
+        results = list(pool.map(_process_session, jobs))
+    all_timings = [timings for timings, _, _ in results]
+    session_mb = np.array([peak for _, _, peak in results])
+    rss = {
+        'baseline_mb': float(np.mean([base for _, base, _ in results])),
+        'per_session_mean_mb': float(session_mb.mean()),
+        'per_session_max_mb': float(session_mb.max()),
+        'total_mb': float(sum(base + peak for _, base, peak in results)),
+    }
+    wall = time.perf_counter() - start
+
+    report = summarize(all_timings)
+    errors = [(i, name, error) for i, timings in enumerate(all_timings) for name, _, error in timings if error]
+    print(f"{'step':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in report.items():
+        print(f"{name:<18}{stats['count']:>7}{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}"
+              f"{stats['p99_ms']:>10.0f}{stats['max_ms']:>10.0f}")
+    print("RSS: " + ", ".join(f"{key}={value:,.0f}" for key, value in rss.items()) + " (MB)")
+    print(f"Wall time {wall:,.1f} s, {len(errors)} error(s)")
+    for session, name, error in errors[:10]:
+        print(f"  session {session} {name}: {error}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'wall_seconds': wall, 'latency': report,
+                       'rss': {**rss, 'per_session_mb': session_mb.tolist()},
+                       'errors': [list(e) for e in errors]}, f, indent=2, default=str)
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,137 @@
+"""Profil kolom dataset (sekali per dataset): tipe, kardinalitas, null rate, min/max dan peran kolom.
+
+Tipe diinferensi dari sampel baris; kardinalitas dihitung exact untuk kolom categorical dan
+diestimasi dengan sketch HyperLogLog untuk kolom lain, sehingga tidak ada `nunique()` penuh.
+"""
+import numpy as np
+import pandas as pd
+
+from ingest import ROWS_COLUMN, is_internal
+
+# Aturan auto-detect kolom: kategori < 20 nilai unik; produk tidak dibatasi (pencarian memakai index)
+CATEGORY_MAX_UNIQUE = 20
+# Kolom dengan rasio unique/baris di atas ini dianggap ID (nomor transaksi, kode unik, ...)
+ID_RATIO = 0.9
+# Minimal porsi nilai sampel yang harus lolos parsing untuk dianggap date-like / numeric-like
+LIKE_THRESHOLD = 0.9
+# Maksimal nilai unik sampel yang diuji untuk date-like / numeric-like
+LIKE_MAX_VALUES = 2000
+
+HLL_PRECISION = 14
+
+
+def hll_estimate(series, p=HLL_PRECISION):
+    """Estimasi jumlah nilai unik (non-null) dengan HyperLogLog, tervektorisasi"""
+    values = series.dropna()
+    if values.empty:
+        return 0
+    # categorize=False: tanpa factorize dulu (factorize sama mahalnya dengan nunique)
+    hashes = pd.util.hash_pandas_object(values, index=False, categorize=False).to_numpy()
+    m = 1 << p
+    register = (hashes >> np.uint64(64 - p)).astype(np.int64)
+    remainder = hashes & np.uint64((1 << (64 - p)) - 1)
+    # Posisi bit 1 pertama dari sisa hash (rank); sisa 0 -> rank maksimum
+    bit_length = np.frexp(remainder.astype(np.float64))[1]
+    rank = ((64 - p) - bit_length + 1).astype(np.int8)
+    registers = np.zeros(m, dtype=np.int8)
+    np.maximum.at(registers, register, rank)
+
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        # Koreksi range kecil (linear counting)
+        estimate = m * np.log(m / zeros)
+    return int(round(min(estimate, len(values))))
+
+
+def _parse_share(counts, parse):
+    """Porsi baris sampel (berbobot) yang lolos `parse`; diuji per nilai unik, bertahap.
+
+    Nilai unik yang paling sering diuji dulu dalam jumlah kecil; hanya jika lolos, hasil
+    dikonfirmasi dengan nilai unik yang lebih banyak (parser tanggal 'mixed' lambat).
+    """
+    for limit in (100, LIKE_MAX_VALUES):
+        top = counts.iloc[:limit]
+        parsed = parse(pd.Series(top.index.astype(str)))
+        share = top.to_numpy()[parsed.notna().to_numpy()].sum() / top.sum()
+        if share < LIKE_THRESHOLD or limit >= len(counts):
+            return share
+    return share
+
+
+def profile_column(series, sample, n_rows, aggregated=False):
+    """Profil satu kolom: kind, cardinality, id_like, null_rate, min, max"""
+    dtype = series.dtype
+    info = {'dtype': str(dtype), 'null_rate': float(series.isna().mean()) if n_rows else 0.0}
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Exact dan murah: jumlah kategori yang benar-benar dipakai
+        codes = series.cat.codes.to_numpy()
+        info['cardinality'] = int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=1)))
+    else:
+        info['cardinality'] = hll_estimate(series)
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        info['kind'] = 'date'
+    elif pd.api.types.is_bool_dtype(dtype):
+        info['kind'] = 'text'
+    elif pd.api.types.is_numeric_dtype(dtype):
+        info['kind'] = 'numeric'
+    else:
+        counts = sample.value_counts(dropna=True)
+        counts = counts[counts > 0]
+        if len(counts) and _parse_share(counts, lambda v: pd.to_numeric(v, errors='coerce')) >= LIKE_THRESHOLD:
+            info['kind'] = 'numeric_like'
+        elif len(counts) and _parse_share(
+                counts, lambda v: pd.to_datetime(v, errors='coerce', format='mixed')) >= LIKE_THRESHOLD:
+            info['kind'] = 'date_like'
+        else:
+            info['kind'] = 'text'
+
+    non_null = n_rows * (1 - info['null_rate'])
+    # Float dan hasil agregasi (frame streaming) hampir selalu unik tanpa menjadi ID
+    can_be_id = info['kind'] in ('text', 'numeric_like') or (
+        info['kind'] == 'numeric' and pd.api.types.is_integer_dtype(dtype) and not aggregated)
+    info['id_like'] = bool(can_be_id and non_null > 1 and info['cardinality'] >= ID_RATIO * non_null)
+
+    if info['kind'] in ('numeric', 'date') and non_null:
+        info['min'], info['max'] = series.min(), series.max()
+    else:
+        info['min'] = info['max'] = None
+    return info
+
+
+def profile_frame(df, sample_rows=100_000, seed=0):
+    """Profil semua kolom dan pilihan kolom untuk sidebar (nilai, tanggal, kategori, produk)"""
+    n_rows = len(df)
+    sample = df.sample(n=sample_rows, random_state=seed) if n_rows > sample_rows else df
+    aggregated = ROWS_COLUMN in df.columns
+    columns = {
+        col: profile_column(df[col], sample[col], n_rows, aggregated)
+        for col in df.columns if not is_internal(col)
+    }
+
+    text_cols = [col for col, info in columns.items() if info['kind'] in ('text', 'numeric_like', 'date_like')]
+    category_cols = [col for col in text_cols if 1 < columns[col]['cardinality'] < CATEGORY_MAX_UNIQUE]
+    product_cols = [
+        col for col in text_cols
+        if col not in category_cols and not columns[col]['id_like']
+    ]
+    numeric_cols = [col for col, info in columns.items() if info['kind'] == 'numeric']
+    return {
+        'rows': n_rows,
+        'columns': columns,
+        # Kolom ID tidak ditawarkan sebagai nilai, kecuali tidak ada kolom numerik lain
+        'numeric_cols': [col for col in numeric_cols if not columns[col]['id_like']] or numeric_cols,
+        'date_cols': [col for col, info in columns.items() if info['kind'] == 'date'],
+        'category_cols': category_cols,
+        'product_cols': product_cols,
+    }
+
+
+def profile_table(profile):
+    """Profil sebagai DataFrame untuk ditampilkan di panel debug"""
+    table = pd.DataFrame.from_dict(profile['columns'], orient='index')
+    table[['min', 'max']] = table[['min', 'max']].fillna('').astype(str)
+    return table.rename_axis('column').reset_index()
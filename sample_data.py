@@ -0,0 +1,140 @@
+"""Generator data sampel supermarket yang tervektorisasi (juga dipakai sebagai fixture benchmark).
+
+Contoh membuat fixture 10 juta baris dari command line:
+
+    python sample_data.py --days 365 --stores 20 --products 50000 --rows-per-day 30000 -o fixture.parquet
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Label kategori per bahasa; data selalu memakai key kanonik (English) dan baru
+# diterjemahkan saat ditampilkan (`category_label`)
+CATEGORIES = {
+    'English': ['Food', 'Beverages', 'Electronics', 'Clothing', 'Household'],
+    'Bahasa Indonesia': ['Makanan', 'Minuman', 'Elektronik', 'Pakaian', 'Rumah Tangga'],
+    '中文': ['食品', '饮料', '电子产品', '服装', '家居用品']
+}
+
+PRODUCTS = {
+    'Food': ['Bread', 'Milk', 'Eggs'],
+    'Beverages': ['Water', 'Juice', 'Coffee'],
+    'Electronics': ['Charger', 'Headphones', 'Cable'],
+    'Clothing': ['T-Shirt', 'Pants', 'Jacket'],
+    'Household': ['Soap', 'Toothpaste', 'Shampoo']
+}
+
+
+# key kanonik -> label, per bahasa
+CATEGORY_LABELS = {
+    language: dict(zip(CATEGORIES['English'], labels)) for language, labels in CATEGORIES.items()
+}
+
+
+def category_label(value, language):
+    """Label tampilan untuk nilai kategori kanonik; nilai yang tidak dikenal ditampilkan apa adanya"""
+    return CATEGORY_LABELS.get(language, {}).get(value, value)
+
+
+def _category_names(n_categories):
+    base = CATEGORIES['English']
+    return [base[i] if i < len(base) else f"Category {i + 1}" for i in range(n_categories)]
+
+
+def _catalog(n_categories, n_products):
+    """Bagi produk merata ke kategori. Return (nama produk, index kategori per produk)"""
+    product_category = (np.arange(n_products) * n_categories) // n_products
+    first_in_category = np.searchsorted(product_category, np.arange(n_categories))
+    english = CATEGORIES['English']
+
+    names = []
+    for i, c in enumerate(product_category):
+        j = i - first_in_category[c]
+        base = PRODUCTS[english[c]] if c < len(english) else []
+        names.append(base[j] if j < len(base) else f"SKU-{c + 1:03d}-{j + 1:06d}")
+    return np.array(names, dtype=object), product_category
+
+
+def generate_sample_data(language='English', start='2024-01-01', days=91, stores=1,
+                         n_categories=5, n_products=15, rows_per_day=None, seed=42):
+    """Buat data transaksi sintetis dengan skema dashboard.
+
+    Kategori memakai key kanonik; `language` selain English hanya me-relabel kamus kategori
+    (untuk file contoh dari command line, dashboard sendiri menerjemahkan saat tampil).
+    Tanpa `rows_per_day` setiap produk muncul sekali per toko per hari (seperti data
+    sampel awal); dengan `rows_per_day` produk dan toko dipilih acak untuk tiap baris.
+    Kolom `Store` hanya ditambahkan jika `stores > 1`.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start, periods=days, freq='D')
+    product_names, product_category = _catalog(n_categories, n_products)
+    category_names = _category_names(n_categories)
+
+    if rows_per_day is None:
+        # Grid penuh: hari x toko x produk
+        per_day = stores * n_products
+        date_idx = np.repeat(np.arange(days), per_day)
+        grid = np.tile(np.arange(per_day), days)
+        store_idx, product_idx = np.divmod(grid, n_products)
+    else:
+        date_idx = np.repeat(np.arange(days), rows_per_day)
+        product_idx = rng.integers(0, n_products, size=len(date_idx))
+        store_idx = rng.integers(0, stores, size=len(date_idx))
+
+    n_rows = len(date_idx)
+    quantity = rng.integers(1, 50, size=n_rows)
+    unit_price = rng.uniform(1000, 50000, size=n_rows)
+    total_price = quantity * unit_price
+    profit = total_price * rng.uniform(0.1, 0.4, size=n_rows)
+
+    # Atribut kalender dihitung per tanggal unik lalu di-broadcast ke baris
+    month_idx, month_names = pd.factorize(dates.strftime('%B'))
+    day_idx, day_names = pd.factorize(dates.strftime('%A'))
+    weeks = dates.isocalendar().week.to_numpy(dtype=np.int64)
+
+    # Kolom teks dibuat langsung sebagai categorical (codes + kamus), tanpa string per baris
+    data = {
+        'Date': dates.values[date_idx],
+        'Category': pd.Categorical.from_codes(product_category[product_idx], categories=category_names),
+        'Product': pd.Categorical.from_codes(product_idx, categories=product_names),
+        'Quantity': quantity,
+        'Unit_Price': unit_price,
+        'Total_Price': total_price,
+        'Profit': profit,
+        'Month': pd.Categorical.from_codes(month_idx[date_idx], categories=month_names),
+        'Day': pd.Categorical.from_codes(day_idx[date_idx], categories=day_names),
+        'Week': weeks[date_idx]
+    }
+    if stores > 1:
+        store_names = [f"Store {i + 1:03d}" for i in range(stores)]
+        data['Store'] = pd.Categorical.from_codes(store_idx, categories=store_names)
+    df = pd.DataFrame(data)
+    if language != 'English':
+        df['Category'] = df['Category'].cat.rename_categories(lambda value: category_label(value, language))
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic supermarket data")
+    parser.add_argument('--language', default='English', choices=list(CATEGORIES))
+    parser.add_argument('--start', default='2024-01-01')
+    parser.add_argument('--days', type=int, default=91)
+    parser.add_argument('--stores', type=int, default=1)
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--products', type=int, default=15)
+    parser.add_argument('--rows-per-day', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-o', '--output', required=True, help="Output file (.parquet or .csv)")
+    args = parser.parse_args()
+
+    df = generate_sample_data(
+        language=args.language, start=args.start, days=args.days, stores=args.stores,
+        n_categories=args.categories, n_products=args.products,
+        rows_per_day=args.rows_per_day, seed=args.seed
+    )
+    if args.output.endswith('.csv'):
+        df.to_csv(args.output, index=False)
+    else:
+        df.to_parquet(args.output, index=False)
+    print(f"{len(df):,} rows written to {args.output}")
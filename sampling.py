@@ -0,0 +1,102 @@
+"""Sampel bertingkat (hari x kategori) untuk pratinjau cepat dengan batas galat.
+
+Setiap strata (satu hari x satu kategori) mendapat jatah sampel sebanding jumlah barisnya
+(Poisson sampling dengan peluang n_h / N_h, minimal satu baris per strata sehingga setiap
+hari dan kategori tetap muncul). Setiap baris sampel berbobot N_h / n_h, jadi cube dari
+sampel berisi estimasi total, jumlah nilai dan jumlah transaksi. Interval kepercayaan
+memakai estimator varians total bertingkat; rata-rata memakai linearisasi rasio.
+"""
+import numpy as np
+import pandas as pd
+
+from aggregations import RollupCube
+from filters import to_day_key
+from ingest import ROWS_COLUMN, count_column, day_key_column, day_keys
+
+# z untuk interval kepercayaan 95%
+Z_95 = 1.959963984540054
+
+
+class StratifiedSample:
+    """Sampel sekitar `size` baris dari `df`, bertingkat per hari x `category_column`"""
+
+    def __init__(self, df, date_column, category_column=None, size=100_000, seed=0):
+        self.date_column = date_column
+        self.population_rows = len(df)
+        key_column = day_key_column(date_column)
+        days = df[key_column].to_numpy() if key_column in df.columns else day_keys(df[date_column])
+        strata_keys = [pd.Categorical(days)]
+        if category_column:
+            strata_keys.append(df[category_column].astype('category').array)
+        codes = np.zeros(len(df), dtype=np.int64)
+        for key in strata_keys:
+            key_codes = key.codes.astype(np.int64)
+            # Nilai kosong jadi code terakhir, tetap satu strata
+            key_codes[key_codes < 0] = len(key.categories)
+            codes = codes * (len(key.categories) + 1) + key_codes
+        _, strata = np.unique(codes, return_inverse=True)
+
+        population = np.bincount(strata)
+        rng = np.random.default_rng(seed)
+        priority = rng.random(len(df))
+        probability = np.minimum(size / max(len(df), 1), 1.0)
+        first = np.full(len(population), np.inf)
+        np.minimum.at(first, strata, priority)
+        selected = np.flatnonzero((priority < probability) | (priority == first[strata]))
+
+        self.strata = strata[selected]
+        self.population = population
+        self.taken = np.bincount(self.strata, minlength=len(population))
+        self.weights = (population / self.taken)[self.strata]
+        self.frame = df.take(selected)
+        self.days = days[selected]
+
+    def __len__(self):
+        return len(self.frame)
+
+    def cube(self, value_column, category_column=None, product_column=None):
+        """RollupCube dari sampel berbobot (nilai = estimasi populasi)"""
+        frame = self.frame.copy(deep=False)
+        frame[day_key_column(self.date_column)] = self.days
+        for column in {value_column, 'Profit', 'Total_Price'} & set(frame.columns):
+            frame[column] = frame[column].to_numpy(dtype=np.float64) * self.weights
+        frame[count_column(value_column)] = self.frame[value_column].notna().to_numpy() * self.weights
+        frame[ROWS_COLUMN] = self.weights
+        return RollupCube(frame, self.date_column, value_column, category_column, product_column)
+
+    def _total(self, values):
+        """Estimasi total bertingkat dan variansnya untuk nilai per baris sampel"""
+        sums = np.bincount(self.strata, weights=values, minlength=len(self.population))
+        squares = np.bincount(self.strata, weights=values * values, minlength=len(self.population))
+        n, N = self.taken, self.population
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance_h = np.where(n > 1, (squares - sums * sums / n) / (n - 1), 0.0)
+            variance = (N * N * (1 - n / N) * np.maximum(variance_h, 0) / n).sum()
+        return float((N / n * sums).sum()), float(variance)
+
+    def estimate(self, value_column, start_date=None, end_date=None,
+                 category_column=None, categories=None, product_column=None, products=None):
+        """Estimasi (nilai, setengah lebar CI 95%) untuk total, rata-rata dan transaksi dalam filter"""
+        inside = np.ones(len(self.frame), dtype=bool)
+        if start_date is not None and end_date is not None:
+            inside &= (self.days >= to_day_key(start_date)) & (self.days <= to_day_key(end_date))
+        if category_column and categories:
+            inside &= self.frame[category_column].isin(categories).to_numpy()
+        if product_column and products:
+            inside &= self.frame[product_column].isin(products).to_numpy()
+
+        raw = self.frame[value_column].to_numpy(dtype=np.float64)
+        present = inside & ~np.isnan(raw)
+        values = np.where(present, raw, 0.0)
+        total, total_variance = self._total(values)
+        count, _ = self._total(present.astype(np.float64))
+        rows, rows_variance = self._total(inside.astype(np.float64))
+        average = total / count if count else 0.0
+        # Linearisasi rasio: residual y - R x
+        residual_variance = self._total(values - average * present)[1]
+        average_variance = residual_variance / (count * count) if count else 0.0
+        return {
+            'total': (total, float(Z_95 * np.sqrt(total_variance))),
+            'average': (average, float(Z_95 * np.sqrt(average_variance))),
+            'transactions': (rows, float(Z_95 * np.sqrt(rows_variance))),
+        }
@@ -0,0 +1,187 @@
+"""Index pencarian produk (n-gram inverted index) yang dibangun sekali per dataset.
+
+Nama dinormalisasi (NFKC + casefold + spasi dirapikan), lalu setiap n-gram 1..3 karakter
+menunjuk ke daftar nomor produk beserta posisi kemunculan pertamanya. Pencarian substring =
+irisan posting list, diurutkan memakai posisi itu, lalu diverifikasi hanya sampai `limit`
+hasil; jika hasil substring sangat sedikit, dilengkapi pencocokan fuzzy berdasarkan jumlah
+n-gram yang sama.
+Karena n-gram dihitung per karakter, nama Latin maupun CJK (tanpa spasi) sama-sama didukung.
+"""
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+MAX_GRAM = 3
+# Porsi minimal n-gram query yang harus ada di nama produk untuk hasil fuzzy
+FUZZY_THRESHOLD = 0.5
+# Hasil fuzzy hanya ditambahkan jika hasil substring kurang dari ini (salah ketik / kata terbalik)
+FUZZY_MIN_RESULTS = 5
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text):
+    """Kunci pencarian: NFKC (huruf lebar penuh -> biasa), huruf kecil, spasi tunggal"""
+    return _SPACES.sub(" ", unicodedata.normalize("NFKC", str(text)).casefold()).strip()
+
+
+def is_cjk(text):
+    return any(
+        "\u3040" <= ch <= "\u30ff" or "\u3400" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af"
+        for ch in text
+    )
+
+
+def ngrams(key, n):
+    return {key[i:i + n] for i in range(len(key) - n + 1)}
+
+
+def first_positions(key, n):
+    """{n-gram: posisi kemunculan pertama} untuk `key`"""
+    positions = {}
+    for i in range(len(key) - n + 1):
+        positions.setdefault(key[i:i + n], i)
+    return positions
+
+
+class ProductSearchIndex:
+    """Pencarian produk: substring dulu (prefix paling atas), lalu fuzzy, maksimal `limit` hasil.
+
+    `groups` (opsional) adalah kolom kategori sejajar dengan `products`; dengan itu pencarian
+    bisa dibatasi ke produk yang muncul di kategori tertentu.
+    """
+
+    def __init__(self, products, groups=None):
+        products = pd.Series(products)
+        if not isinstance(products.dtype, pd.CategoricalDtype):
+            products = products.astype('category')
+        self.labels = products.cat.categories
+        self.keys = [normalize(label) for label in self.labels]
+        self._lengths = np.array([len(key) for key in self.keys], dtype=np.int32)
+
+        postings = [{} for _ in range(MAX_GRAM + 1)]
+        for product_id, key in enumerate(self.keys):
+            for n in range(1, MAX_GRAM + 1):
+                for gram, position in first_positions(key, n).items():
+                    ids, positions = postings[n].setdefault(gram, ([], []))
+                    ids.append(product_id)
+                    positions.append(position)
+        # Posting list terurut (id naik) sebagai int32 untuk irisan cepat, dengan posisi sejajar
+        self._postings = [{gram: np.array(ids, dtype=np.int32) for gram, (ids, _) in grams.items()}
+                          for grams in postings]
+        self._positions = [{gram: np.array(positions, dtype=np.int32) for gram, (_, positions) in grams.items()}
+                           for grams in postings]
+
+        self._group_labels = None
+        if groups is not None:
+            groups = pd.Series(groups)
+            if not isinstance(groups.dtype, pd.CategoricalDtype):
+                groups = groups.astype('category')
+            codes = products.cat.codes.to_numpy().astype(np.int64)
+            group_codes = groups.cat.codes.to_numpy().astype(np.int64)
+            valid = (codes >= 0) & (group_codes >= 0)
+            n_groups = max(len(groups.cat.categories), 1)
+            pairs = np.unique(codes[valid] * n_groups + group_codes[valid])
+            self._pair_products = pairs // n_groups
+            self._pair_groups = pairs % n_groups
+            self._group_labels = groups.cat.categories
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _allowed(self, groups):
+        """Mask produk yang muncul di salah satu `groups`; None = semua produk"""
+        if groups is None or self._group_labels is None:
+            return None
+        wanted = self._group_labels.get_indexer(list(groups))
+        allowed = np.zeros(len(self.labels), dtype=bool)
+        allowed[self._pair_products[np.isin(self._pair_groups, wanted[wanted >= 0])]] = True
+        return allowed
+
+    def count(self, groups=None):
+        """Jumlah produk yang bisa dicari (dibatasi ke `groups` jika diberikan)"""
+        allowed = self._allowed(groups)
+        return len(self.labels) if allowed is None else int(np.count_nonzero(allowed))
+
+    def _substring(self, query):
+        """(ids, posisi) kandidat substring. Untuk query sampai MAX_GRAM karakter hasilnya pasti
+        cocok dan posisinya exact; untuk query lebih panjang posisinya adalah kemunculan pertama
+        n-gram awal query (batas bawah posisi query) dan kandidat masih harus diverifikasi.
+        """
+        n = min(len(query), MAX_GRAM)
+        empty = np.array([], dtype=np.int32)
+        if len(query) <= MAX_GRAM:
+            if query not in self._postings[n]:
+                return empty, empty
+            return self._postings[n][query], self._positions[n][query]
+        lists = sorted((self._postings[n].get(gram) for gram in ngrams(query, n)),
+                       key=lambda ids: -1 if ids is None else len(ids))
+        if lists[0] is None:
+            return empty, empty
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return empty, empty
+        lead = query[:n]
+        positions = self._positions[n][lead][np.searchsorted(self._postings[n][lead], candidates)]
+        return candidates, positions
+
+    def _fuzzy(self, query):
+        """(ids, skor) produk yang memuat cukup banyak n-gram query (salah ketik, kata terbalik)"""
+        n = 2 if is_cjk(query) or len(query) < MAX_GRAM else MAX_GRAM
+        grams = ngrams(query, n)
+        lists = [self._postings[n][gram] for gram in grams if gram in self._postings[n]]
+        if not lists:
+            return np.array([], dtype=np.int32), np.array([])
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.labels))
+        ids = np.flatnonzero(shared)
+        scores = shared[ids] / len(grams)
+        keep = scores >= FUZZY_THRESHOLD
+        return ids[keep].astype(np.int32), scores[keep]
+
+    def search(self, query, limit=50, groups=None):
+        """Label produk yang cocok dengan `query`, terurut menurut relevansi"""
+        query = normalize(query)
+        allowed = self._allowed(groups)
+        if not query:
+            ids = np.arange(len(self.labels)) if allowed is None else np.flatnonzero(allowed)
+            return list(self.labels[ids[:limit]])
+
+        candidates, positions = self._substring(query)
+        if allowed is not None:
+            keep = allowed[candidates]
+            candidates, positions = candidates[keep], positions[keep]
+        # Ranking: prefix dulu, lalu posisi kemunculan, lalu nama terpendek
+        order = np.lexsort((self._lengths[candidates], positions, positions != 0))
+        candidates, positions = candidates[order], positions[order]
+        if len(query) <= MAX_GRAM:
+            exact = candidates
+            ranked = list(candidates[:limit])
+        else:
+            # Posisi kandidat adalah batas bawah, jadi verifikasi mengikuti ranking dan berhenti
+            # begitu `limit` hasil terkumpul dan sisa kandidat tidak mungkin menyalip hasil terburuk
+            hits = []
+            for i, lower in zip(candidates, positions):
+                i, lower, length = int(i), int(lower), int(self._lengths[i])
+                if len(hits) == limit and (lower != 0, lower, length) >= hits[-1][0]:
+                    break
+                position = self.keys[i].find(query)
+                if position >= 0:
+                    bisect.insort(hits, ((position != 0, position, length), i))
+                    del hits[limit:]
+            exact = np.array([i for _, i in hits], dtype=np.int32)
+            ranked = list(exact[:limit])
+
+        if len(exact) < FUZZY_MIN_RESULTS and len(ranked) < limit and len(query) > 1:
+            ids, scores = self._fuzzy(query)
+            if allowed is not None:
+                ids, scores = ids[allowed[ids]], scores[allowed[ids]]
+            fresh = ~np.isin(ids, exact)
+            ids, scores = ids[fresh], scores[fresh]
+            order = np.lexsort((self._lengths[ids], -scores))
+            ranked += list(ids[order][:limit - len(ranked)])
+        return list(self.labels[np.asarray(ranked, dtype=np.int64)])
@@ -0,0 +1,187 @@
+"""Frame bersama lintas sesi dan proses: file Arrow IPC yang di-memory-map (zero-copy).
+
+Frame ditulis sekali sebagai file Arrow IPC tanpa kompresi dengan satu record batch, sehingga
+kolom numerik/tanggal tanpa null dan codes kolom category dibaca langsung dari halaman file
+di page cache OS. Semua sesi dan semua proses worker berbagi memori fisik yang sama; yang
+privat per sesi hanya hasil filter dan agregat kecil.
+
+Pemakaian dihitung per pemilik (sesi Streamlit) dengan lease: setiap rerun memperbarui
+lease, dan pemilik yang tidak aktif lebih dari `ttl` detik dianggap selesai. Proses lain
+terlihat lewat file `leases/<key>@<pid>`. `sweep()` menghapus file yang tidak dipakai lagi.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+import pyarrow as pa
+
+# Metadata schema berisi df.attrs (sama dengan kunci yang dipakai pandas untuk Parquet)
+ATTRS_KEY = b'PANDAS_ATTRS'
+
+
+def _safe_name(key):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', str(key))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Proses ada tetapi milik user lain
+        return True
+    return True
+
+
+class SharedFrames:
+    """Store frame read-only di `directory`, dibagi ke semua sesi dan proses"""
+
+    def __init__(self, directory, ttl=1800, sweep_interval=60):
+        self.directory = directory
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._frames = {}  # key -> DataFrame yang di-memory-map (per proses)
+        self._owners = {}  # owner -> (key, waktu terakhir terlihat)
+        self._leases = {}  # key -> waktu lease proses ini terakhir diperbarui
+        self._last_sweep = time.time()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.directory, 'leases'), exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{_safe_name(key)}.arrow")
+
+    def _lease_path(self, key, pid=None):
+        return os.path.join(self.directory, 'leases', f"{_safe_name(key)}@{pid or os.getpid()}")
+
+    def put(self, key, df, sort_by=None):
+        """Tulis frame sekali (no-op jika sudah ada). `sort_by`: kolom tanggal yang diurutkan dulu,
+        supaya DateIndex bisa memakai frame apa adanya tanpa salinan terurut per proses"""
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        if sort_by is not None and sort_by in df.columns and not df[sort_by].is_monotonic_increasing:
+            df = df.sort_values(sort_by, kind='stable', na_position='first', ignore_index=True)
+        table = pa.Table.from_pandas(df, preserve_index=None)
+        metadata = dict(table.schema.metadata or {})
+        if df.attrs:
+            metadata[ATTRS_KEY] = json.dumps(df.attrs, default=str).encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        """Frame yang di-memory-map, atau None jika belum ditulis"""
+        with self._lock:
+            df = self._frames.get(key)
+            if df is not None:
+                return df
+        try:
+            table = pa.ipc.open_file(pa.memory_map(self._path(key))).read_all()
+        except (OSError, pa.ArrowInvalid):
+            return None
+        # split_blocks: satu blok per kolom, sehingga kolom tanpa null tidak disalin
+        df = table.to_pandas(split_blocks=True)
+        attrs = (table.schema.metadata or {}).get(ATTRS_KEY)
+        if attrs:
+            df.attrs = json.loads(attrs)
+        with self._lock:
+            df = self._frames.setdefault(key, df)
+        return df
+
+    def acquire(self, key, owner):
+        """Catat bahwa `owner` (sesi) sedang memakai `key`; dipanggil setiap rerun"""
+        now = time.time()
+        with self._lock:
+            self._owners[owner] = (key, now)
+            refresh = now - self._leases.get(key, 0) > self.ttl / 10
+            if refresh:
+                self._leases[key] = now
+            sweep = now - self._last_sweep > self.sweep_interval
+            if sweep:
+                self._last_sweep = now
+        if refresh and os.path.exists(self._path(key)):
+            with open(self._lease_path(key), 'a'):
+                pass
+            os.utime(self._lease_path(key))
+        if sweep:
+            self.sweep()
+
+    def refcount(self, key):
+        """Jumlah sesi aktif di proses ini yang memakai `key`"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            return sum(1 for used, seen in self._owners.values() if used == key and seen >= cutoff)
+
+    def _other_leases(self, key, cutoff):
+        """True jika proses lain yang masih hidup memperbarui lease `key` dalam periode ttl"""
+        prefix = f"{_safe_name(key)}@"
+        for entry in os.scandir(os.path.join(self.directory, 'leases')):
+            if not entry.name.startswith(prefix):
+                continue
+            pid = int(entry.name[len(prefix):])
+            if pid == os.getpid():
+                continue
+            try:
+                fresh = entry.stat().st_mtime >= cutoff
+            except OSError:
+                continue
+            if fresh and _pid_alive(pid):
+                return True
+            # Lease basi atau prosesnya sudah mati
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        return False
+
+    def sweep(self):
+        """Lepas frame tanpa pemilik aktif di proses ini dan hapus file yang tidak dipakai siapa pun"""
+        now = time.time()
+        cutoff = now - self.ttl
+        with self._lock:
+            self._owners = {owner: used for owner, used in self._owners.items() if used[1] >= cutoff}
+            live = {key for key, _ in self._owners.values()}
+            for key in [key for key in self._frames if key not in live]:
+                # Memory map dilepas saat frame terakhir di sesi mana pun di-garbage-collect
+                del self._frames[key]
+            for key in [key for key in self._leases if key not in live]:
+                del self._leases[key]
+                try:
+                    os.remove(self._lease_path(key))
+                except OSError:
+                    pass
+            live_files = {_safe_name(key) for key in live}
+
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.arrow'):
+                continue
+            name = entry.name[:-len('.arrow')]
+            try:
+                # File baru ditulis mendapat masa tenggang satu ttl sebelum boleh dihapus
+                if name in live_files or entry.stat().st_mtime >= cutoff or self._other_leases(name, cutoff):
+                    continue
+                # Di Linux, proses yang masih me-map file tetap bisa membacanya setelah unlink
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self):
+        """Ringkasan untuk panel debug"""
+        files = [e for e in os.scandir(self.directory) if e.name.endswith('.arrow')]
+        with self._lock:
+            owners = len(self._owners)
+            frames = len(self._frames)
+        return {
+            'files': len(files),
+            'disk_mb': sum(e.stat().st_size for e in files) / 1024 ** 2,
+            'mapped': frames,
+            'sessions': owners,
+        }
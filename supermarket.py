@@ -2,11 +2,31 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 import warnings
 import io
 import json
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from ingest import (IngestCache, OPENPYXL_EXTENSIONS, compact_frame, content_hash, excel_layout, expand_sources,
+                    is_internal, parse_file, parse_many, stream_csv)
+from filters import DateIndex, FilterIndex, from_day_key
+from dataset_store import PartitionedDataset, SchemaError
+from shared_frames import SharedFrames
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from aggregations import (RollupCube, summary, by_category, top_products, product_detail, product_detail_rows, daily, trend_detail, monthly,
+                          weekly_average, periods, moving_averages, PrefixSums, compare_periods, comparison_ranges)
+from calendar_dim import Calendar, GRANULARITIES, MOVING_AVERAGE_WINDOWS
+from downsample import downsample
+from export import ExportCache, FORMATS as EXPORT_FORMATS
+from sample_data import category_label, generate_sample_data
+from profiler import profile_frame, profile_table
+from sampling import StratifiedSample
+from search import ProductSearchIndex
+import charts
+from timing import MetricsRegistry, StageTimer
 warnings.filterwarnings('ignore')
 
 # ⚠️ HARUS di baris pertama setelah import
@@ -17,12 +37,50 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ==================== KONFIGURASI ====================
+# Bisa diubah lewat environment variable saat deploy
+INGEST_CACHE_DIR = os.environ.get("SUPERMARKET_CACHE_DIR", os.path.join(".cache", "ingest"))
+INGEST_CACHE_DISK_MB = int(os.environ.get("SUPERMARKET_CACHE_DISK_MB", "2048"))
+INGEST_CACHE_MEMORY_MB = int(os.environ.get("SUPERMARKET_CACHE_MEMORY_MB", "1024"))
+# Kompaksi saat ingest: kolom teks -> category jika rasio unique/baris <= nilai ini
+COMPACT_CATEGORY_RATIO = float(os.environ.get("SUPERMARKET_CATEGORY_RATIO", "0.5"))
+COMPACT_DOWNCAST = os.environ.get("SUPERMARKET_DOWNCAST", "1") == "1"
+# Streaming CSV: ukuran chunk (baris) dan ukuran file yang otomatis memakai mode streaming
+STREAM_CHUNK_ROWS = int(os.environ.get("SUPERMARKET_STREAM_CHUNK_ROWS", "500000"))
+STREAM_AUTO_MB = int(os.environ.get("SUPERMARKET_STREAM_AUTO_MB", "500"))
+# Grafik tren: budget titik per trace, metode downsampling (lttb/minmax), dan batas pindah ke WebGL
+TREND_POINT_BUDGET = int(os.environ.get("SUPERMARKET_TREND_POINTS", "2000"))
+TREND_DOWNSAMPLE = os.environ.get("SUPERMARKET_TREND_DOWNSAMPLE", "lttb")
+TREND_WEBGL_THRESHOLD = int(os.environ.get("SUPERMARKET_TREND_WEBGL", "1000"))
+# Jumlah baris sampel untuk inferensi tipe kolom pada profil dataset
+PROFILE_SAMPLE_ROWS = int(os.environ.get("SUPERMARKET_PROFILE_SAMPLE_ROWS", "100000"))
+# Jumlah maksimal produk yang ditampilkan sebagai pilihan hasil pencarian
+PRODUCT_SEARCH_LIMIT = int(os.environ.get("SUPERMARKET_PRODUCT_SEARCH_LIMIT", "200"))
+# Instrumentasi per tahap: aktif/tidak, log JSON lines, dan file metrik (format Prometheus)
+TIMING_ENABLED = os.environ.get("SUPERMARKET_TIMING", "1") == "1"
+TIMING_LOG = os.environ.get("SUPERMARKET_TIMING_LOG", "")
+METRICS_FILE = os.environ.get("SUPERMARKET_METRICS_FILE", "")
+# Multi-file ingest: jumlah worker process (0 = jumlah CPU, 1 = tanpa pool) dan folder/glob lokal opsional
+INGEST_WORKERS = int(os.environ.get("SUPERMARKET_INGEST_WORKERS", "0"))
+LOCAL_SOURCE = os.environ.get("SUPERMARKET_LOCAL_SOURCE", "")
+# Dataset persisten (partisi Parquet per tanggal) untuk menambah data harian tanpa upload ulang histori
+DATASET_DIR = os.environ.get("SUPERMARKET_DATASET_DIR", os.path.join(".data", "dataset"))
+# Frame bersama (Arrow IPC, memory-mapped) untuk semua sesi dan proses; file dihapus setelah TTL tanpa pemakai
+SHARED_FRAMES = os.environ.get("SUPERMARKET_SHARED_FRAMES", "1") == "1"
+SHARED_FRAMES_TTL = int(os.environ.get("SUPERMARKET_SHARED_TTL", "1800"))
+# Mode progresif: di atas jumlah baris ini tab dirender dulu dari sampel bertingkat (0 = nonaktif)
+APPROX_ROWS = int(os.environ.get("SUPERMARKET_APPROX_ROWS", "1000000"))
+APPROX_SAMPLE_ROWS = int(os.environ.get("SUPERMARKET_APPROX_SAMPLE_ROWS", "100000"))
+
+# Timer untuk rerun ini; hasilnya tampil di panel debug dan dikirim ke registry di akhir script
+timer = StageTimer(enabled=TIMING_ENABLED)
+
 # ==================== MULTI-LANGUAGE SUPPORT ====================
 language_dict = {
     "English": {
         "title": "🛒 Supermarket Analytics Dashboard",
         "upload_title": "📤 Upload Excel File",
-        "upload_desc": "Upload your supermarket data (Excel format)",
+        "upload_desc": "Upload your supermarket data (Excel/CSV, one or more files)",
         "sample_data": "Use Sample Data",
         "filter_data": "Filter Data",
         "value_column": "Select Value Column",
@@ -42,14 +100,25 @@ language_dict = {
         "profit_margin": "Profit Margin by Category",
         "top_products": "Top 10 Best Selling Products",
         "product_details": "Product Details",
+        "sort_by": "Sort By",
+        "descending": "Descending",
+        "rows_per_page": "Rows per Page",
+        "page": "Page",
+        "page_info": "Page {page:,} of {pages:,} ({total:,} rows)",
         "daily_trend": "Daily Trend",
         "monthly": "Monthly",
         "weekly": "Weekly",
         "export": "Export Data",
-        "download_csv": "Download Data (CSV)",
+        "export_format": "Export Format",
+        "download_data": "Download Data",
         "footer": "Supermarket Analytics Dashboard • Made with Streamlit & Plotly • Updated: {date}",
         "no_file": "No file uploaded. Using sample data.",
+        "saved_dataset": "Saved dataset ({days} days, {first} – {last})",
+        "append_dataset": "➕ Append upload to saved dataset",
+        "append_done": "Appended {rows:,} rows over {days} days ({replaced} existing days replaced)",
         "file_loaded": "File successfully loaded!",
+        "local_files": "Local files",
+        "files_failed": "{n} file(s) could not be read",
         "invalid_file": "Invalid file format. Please upload Excel file.",
         "error_chart": "Error displaying chart",
         "refresh_page": "Try refreshing the page or check your data.",
@@ -60,16 +129,39 @@ language_dict = {
         "search_product": "Search Product",
         "select_all": "Select All",
         "clear_all": "Clear All",
+        "search_hint": "Showing {shown:,} of {total:,} products, type to search",
         "revenue": "Revenue",
         "quantity": "Quantity",
         "profit": "Profit",
         "unit_price": "Unit Price",
-        "total_price": "Total Price"
+        "total_price": "Total Price",
+        "streaming_mode": "Streaming mode (large CSV)",
+        "excel_options": "Excel options",
+        "sheet": "Sheet",
+        "columns_to_load": "Columns to load",
+        "streaming_info": "Streaming mode: the file was read in chunks and aggregated per day; each row is a daily total.",
+        "zoom_hint": "Drag a box on the chart to zoom in at full resolution.",
+        "reset_zoom": "Reset zoom",
+        "trend": "Trend",
+        "granularity": "Granularity",
+        "granularities": {"day": "Day", "week": "Week", "month": "Month", "quarter": "Quarter"},
+        "moving_average": "{window}-day average",
+        "compare_with": "Compare with",
+        "comparisons": {"previous": "Previous period", "last_year": "Same period last year"},
+        "compare_range": "Compared with {start} – {end}",
+        "no_comparison": "No data in the comparison period ({start} – {end})",
+        "partial_comparison": "Comparison period {start} – {end} starts before the first date in the data ({first}); changes are not shown",
+        "approximate": "Approximate",
+        "approximate_info": "Preview from a stratified sample of {sample:,} of {rows:,} rows; exact results are being computed.",
+        "confidence": "95% CI ± {value}",
+        "computing_exact": "Computing exact results…",
+        "cube_failed": "Exact aggregation failed",
+        "sample_fallback": "Showing estimates from a stratified sample of {sample:,} of {rows:,} rows instead."
     },
     "Bahasa Indonesia": {
         "title": "🛒 Dashboard Analisis Supermarket",
         "upload_title": "📤 Unggah File Excel",
-        "upload_desc": "Unggah data supermarket Anda (format Excel)",
+        "upload_desc": "Unggah data supermarket Anda (Excel/CSV, satu atau beberapa file)",
         "sample_data": "Gunakan Data Contoh",
         "filter_data": "Filter Data",
         "value_column": "Pilih Kolom Nilai",
@@ -89,14 +181,25 @@ language_dict = {
         "profit_margin": "Margin Profit per Kategori",
         "top_products": "10 Produk Terlaris Teratas",
         "product_details": "Detail Produk",
+        "sort_by": "Urutkan Berdasarkan",
+        "descending": "Menurun",
+        "rows_per_page": "Baris per Halaman",
+        "page": "Halaman",
+        "page_info": "Halaman {page:,} dari {pages:,} ({total:,} baris)",
         "daily_trend": "Tren Harian",
         "monthly": "Bulanan",
         "weekly": "Mingguan",
         "export": "Ekspor Data",
-        "download_csv": "Unduh Data (CSV)",
+        "export_format": "Format Ekspor",
+        "download_data": "Unduh Data",
         "footer": "Dashboard Analisis Supermarket • Dibuat dengan Streamlit & Plotly • Diperbarui: {date}",
         "no_file": "Tidak ada file yang diunggah. Menggunakan data contoh.",
+        "saved_dataset": "Dataset tersimpan ({days} hari, {first} – {last})",
+        "append_dataset": "➕ Tambahkan upload ke dataset tersimpan",
+        "append_done": "{rows:,} baris ditambahkan untuk {days} hari ({replaced} hari lama diganti)",
         "file_loaded": "File berhasil dimuat!",
+        "local_files": "File lokal",
+        "files_failed": "{n} file tidak dapat dibaca",
         "invalid_file": "Format file tidak valid. Harap unggah file Excel.",
         "error_chart": "Error menampilkan grafik",
         "refresh_page": "Coba refresh halaman atau periksa data Anda.",
@@ -107,16 +210,39 @@ language_dict = {
         "search_product": "Cari Produk",
         "select_all": "Pilih Semua",
         "clear_all": "Hapus Semua",
+        "search_hint": "Menampilkan {shown:,} dari {total:,} produk, ketik untuk mencari",
         "revenue": "Pendapatan",
         "quantity": "Jumlah",
         "profit": "Profit",
         "unit_price": "Harga Satuan",
-        "total_price": "Total Harga"
+        "total_price": "Total Harga",
+        "streaming_mode": "Mode streaming (CSV besar)",
+        "excel_options": "Opsi Excel",
+        "sheet": "Sheet",
+        "columns_to_load": "Kolom yang dimuat",
+        "streaming_info": "Mode streaming: file dibaca per chunk dan diagregasi per hari; setiap baris adalah total harian.",
+        "zoom_hint": "Seret kotak pada grafik untuk zoom dengan resolusi penuh.",
+        "reset_zoom": "Atur ulang zoom",
+        "trend": "Tren",
+        "granularity": "Granularitas",
+        "granularities": {"day": "Hari", "week": "Minggu", "month": "Bulan", "quarter": "Kuartal"},
+        "moving_average": "Rata-rata {window} hari",
+        "compare_with": "Bandingkan dengan",
+        "comparisons": {"previous": "Periode sebelumnya", "last_year": "Periode yang sama tahun lalu"},
+        "compare_range": "Dibandingkan dengan {start} – {end}",
+        "no_comparison": "Tidak ada data di periode pembanding ({start} – {end})",
+        "partial_comparison": "Periode pembanding {start} – {end} dimulai sebelum tanggal pertama data ({first}); perubahan tidak ditampilkan",
+        "approximate": "Perkiraan",
+        "approximate_info": "Pratinjau dari sampel bertingkat {sample:,} dari {rows:,} baris; hasil exact sedang dihitung.",
+        "confidence": "CI 95% ± {value}",
+        "computing_exact": "Menghitung hasil exact…",
+        "cube_failed": "Agregasi exact gagal",
+        "sample_fallback": "Sebagai gantinya ditampilkan perkiraan dari sampel bertingkat {sample:,} dari {rows:,} baris."
     },
     "中文": {
         "title": "🛒 超市分析仪表板",
         "upload_title": "📤 上传Excel文件",
-        "upload_desc": "上传您的超市数据（Excel格式）",
+        "upload_desc": "上传您的超市数据（Excel/CSV，一个或多个文件）",
         "sample_data": "使用示例数据",
         "filter_data": "筛选数据",
         "value_column": "选择数值列",
@@ -136,14 +262,25 @@ language_dict = {
         "profit_margin": "按类别利润率",
         "top_products": "前10个畅销产品",
         "product_details": "产品详情",
+        "sort_by": "排序方式",
+        "descending": "降序",
+        "rows_per_page": "每页行数",
+        "page": "页码",
+        "page_info": "第 {page:,} / {pages:,} 页（共 {total:,} 行）",
         "daily_trend": "每日趋势",
         "monthly": "月度",
         "weekly": "周度",
         "export": "导出数据",
-        "download_csv": "下载数据（CSV）",
+        "export_format": "导出格式",
+        "download_data": "下载数据",
         "footer": "超市分析仪表板 • 使用Streamlit和Plotly制作 • 更新时间: {date}",
         "no_file": "未上传文件。使用示例数据。",
+        "saved_dataset": "已保存的数据集（{days} 天，{first} – {last}）",
+        "append_dataset": "➕ 将上传追加到已保存的数据集",
+        "append_done": "已追加 {rows:,} 行，共 {days} 天（替换了 {replaced} 个已有日期）",
         "file_loaded": "文件加载成功！",
+        "local_files": "本地文件",
+        "files_failed": "{n} 个文件无法读取",
         "invalid_file": "文件格式无效。请上传Excel文件。",
         "error_chart": "显示图表时出错",
         "refresh_page": "尝试刷新页面或检查您的数据。",
@@ -154,11 +291,34 @@ language_dict = {
         "search_product": "搜索产品",
         "select_all": "全选",
         "clear_all": "清除全部",
+        "search_hint": "显示 {shown:,} / {total:,} 个产品，输入以搜索",
         "revenue": "收入",
         "quantity": "数量",
         "profit": "利润",
         "unit_price": "单价",
-        "total_price": "总价"
+        "total_price": "总价",
+        "streaming_mode": "流式模式（大型CSV）",
+        "excel_options": "Excel选项",
+        "sheet": "工作表",
+        "columns_to_load": "要加载的列",
+        "streaming_info": "流式模式：文件已分块读取并按天汇总；每行为每日合计。",
+        "zoom_hint": "在图表上框选区域以全分辨率放大。",
+        "reset_zoom": "重置缩放",
+        "trend": "趋势",
+        "granularity": "粒度",
+        "granularities": {"day": "日", "week": "周", "month": "月", "quarter": "季度"},
+        "moving_average": "{window}日均线",
+        "compare_with": "对比",
+        "comparisons": {"previous": "上一周期", "last_year": "去年同期"},
+        "compare_range": "对比 {start} – {end}",
+        "no_comparison": "对比周期内无数据（{start} – {end}）",
+        "partial_comparison": "对比周期 {start} – {end} 早于数据的首个日期（{first}），不显示变化",
+        "approximate": "近似值",
+        "approximate_info": "基于 {rows:,} 行中 {sample:,} 行分层样本的预览；精确结果正在计算中。",
+        "confidence": "95% 置信区间 ± {value}",
+        "computing_exact": "正在计算精确结果…",
+        "cube_failed": "精确聚合失败",
+        "sample_fallback": "改为显示基于 {rows:,} 行中 {sample:,} 行分层样本的估计值。"
     }
 }
 
@@ -219,6 +379,16 @@ with col3:
 # Ambil teks berdasarkan bahasa
 text = language_dict[language]
 
+# Data, filter dan agregat memakai nilai kanonik; bahasa hanya dipakai saat menampilkan label
+def display_category(value):
+    return category_label(value, language)
+
+def localize_categories(frame, column='category'):
+    """Salinan dangkal dengan kamus kategori diterjemahkan (pada categorical hanya kamusnya)"""
+    if column not in frame.columns:
+        return frame
+    return frame.assign(**{column: frame[column].map(display_category)})
+
 # Header
 st.markdown(f'<h1 class="main-header">{text["title"]}</h1>', unsafe_allow_html=True)
 
@@ -228,92 +398,272 @@ st.markdown(f'<div class="upload-section"><h3>{text["upload_title"]}</h3></div>'
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         text["upload_desc"],
         type=['xlsx', 'xls', 'csv'],
-        help="Upload Excel file containing supermarket data"
+        help="Upload one Excel/CSV file, or one file per store (parsed in parallel)",
+        accept_multiple_files=True,
+        # Key tetap: label berubah saat ganti bahasa, file yang sudah diupload tidak boleh hilang
+        key="uploaded_files"
     )
+    uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
 
 with col2:
-    use_sample = st.checkbox(text["sample_data"], value=True)
+    use_sample = st.checkbox(text["sample_data"], value=True, key="use_sample")
+    use_streaming = st.checkbox(text["streaming_mode"], value=False, key="use_streaming")
+    # Sumber lokal hanya tersedia jika dikonfigurasi server (SUPERMARKET_LOCAL_SOURCE)
+    use_local = bool(LOCAL_SOURCE) and st.checkbox(f"{text['local_files']}: {LOCAL_SOURCE}", value=False, key="use_local")
 
-# Fungsi untuk generate data sampel
-@st.cache_data
-def generate_sample_data():
-    np.random.seed(42)
-    dates = pd.date_range(start='2024-01-01', end='2024-03-31', freq='D')  # Kurangi untuk performa
-    
-    # Multi-language categories
-    categories = {
-        'English': ['Food', 'Beverages', 'Electronics', 'Clothing', 'Household'],
-        'Bahasa Indonesia': ['Makanan', 'Minuman', 'Elektronik', 'Pakaian', 'Rumah Tangga'],
-        '中文': ['食品', '饮料', '电子产品', '服装', '家居用品']
-    }
-    
-    products = {
-        'Food': ['Bread', 'Milk', 'Eggs'],
-        'Beverages': ['Water', 'Juice', 'Coffee'],
-        'Electronics': ['Charger', 'Headphones', 'Cable'],
-        'Clothing': ['T-Shirt', 'Pants', 'Jacket'],
-        'Household': ['Soap', 'Toothpaste', 'Shampoo']
-    }
-    
-    data = []
-    for date in dates:
-        for category_en in categories['English']:
-            for product in products[category_en]:
-                quantity = np.random.randint(1, 50)
-                unit_price = np.random.uniform(1000, 50000)
-                total_price = quantity * unit_price
-                profit = total_price * np.random.uniform(0.1, 0.4)
-                
-                # Create entry for selected language
-                category = categories[language][categories['English'].index(category_en)]
-                
-                data.append({
-                    'Date': date,
-                    'Category': category,
-                    'Product': product,
-                    'Quantity': quantity,
-                    'Unit_Price': unit_price,
-                    'Total_Price': total_price,
-                    'Profit': profit,
-                    'Month': date.strftime('%B'),
-                    'Day': date.strftime('%A'),
-                    'Week': date.isocalendar().week
-                })
-    
-    df = pd.DataFrame(data)
-    return df
+# Kompaksi data (category + downcast + day key) dijalankan sekali saat ingest
+compact_data = partial(compact_frame, category_ratio=COMPACT_CATEGORY_RATIO, downcast=COMPACT_DOWNCAST)
+
+# Data sampel dengan kategori kanonik: satu salinan untuk semua bahasa dan sesi
+@st.cache_resource
+def load_sample_data():
+    return compact_data(generate_sample_data())
+
+# Frame bersama lintas proses (None jika dimatikan)
+@st.cache_resource
+def get_shared_frames():
+    if not SHARED_FRAMES:
+        return None
+    return SharedFrames(os.path.join(INGEST_CACHE_DIR, "shared"), ttl=SHARED_FRAMES_TTL)
+
+# Cache hasil parsing dibagi ke semua sesi dalam satu proses server
+@st.cache_resource
+def get_ingest_cache():
+    return IngestCache(
+        INGEST_CACHE_DIR,
+        max_disk_bytes=INGEST_CACHE_DISK_MB * 1024 ** 2,
+        max_memory_bytes=INGEST_CACHE_MEMORY_MB * 1024 ** 2,
+        prepare=compact_data,
+        prepare_key=f"compact:{COMPACT_CATEGORY_RATIO}:{COMPACT_DOWNCAST}",
+        shared=get_shared_frames()
+    )
+
+# Registry metrik per proses (akumulasi semua sesi)
+@st.cache_resource
+def get_metrics_registry():
+    return MetricsRegistry(log_path=TIMING_LOG, metrics_path=METRICS_FILE)
+
+# Process pool untuk parsing banyak file; spawn karena server Streamlit multi-thread (fork tidak aman)
+@st.cache_resource
+def get_ingest_pool():
+    return ProcessPoolExecutor(
+        max_workers=INGEST_WORKERS or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+# Index tanggal dibuat sekali per dataset + kolom tanggal dan dibagi ke semua sesi
+@st.cache_resource(max_entries=8)
+def get_date_index(dataset_key, date_column, _df):
+    return DateIndex(_df, date_column)
+
+# Bitmap nilai kategori/produk di atas frame (terurut per tanggal), dibagi ke semua sesi;
+# seleksi yang pernah dihitung di-memo, jadi kembali ke filter sebelumnya langsung
+@st.cache_resource(max_entries=8)
+def get_filter_index(dataset_key, date_column, _df):
+    return FilterIndex(_df)
+
+# Profil kolom (tipe, kardinalitas, null rate) dihitung sekali per dataset, bukan setiap rerun
+@st.cache_resource(max_entries=8)
+def get_profile(dataset_key, _df):
+    return profile_frame(_df, sample_rows=PROFILE_SAMPLE_ROWS)
+
+# Index pencarian produk (n-gram) per dataset + kolom produk, dibagi ke semua sesi
+@st.cache_resource(max_entries=8)
+def get_search_index(dataset_key, product_column, category_column, _df):
+    return ProductSearchIndex(_df[product_column], _df[category_column] if category_column else None)
+
+# Dataset persisten dibagi ke semua sesi; isinya dibaca sekali per versi (naik setiap append)
+@st.cache_resource
+def get_dataset_store():
+    return PartitionedDataset(DATASET_DIR)
+
+@st.cache_resource(max_entries=2)
+def load_dataset(version):
+    shared = get_shared_frames()
+    if shared is None:
+        return get_dataset_store().load()
+    key = f"dataset:{version}"
+    if shared.get(key) is None:
+        df = get_dataset_store().load()
+        shared.put(key, df, sort_by=df.attrs.get('dataset', {}).get('date_column'))
+    return shared.get(key)
+
+dataset_store = get_dataset_store()
+# Append memicu rerun supaya pilihan dataset di bawah ikut diperbarui; hasilnya ditampilkan di rerun itu
+append_result = st.session_state.pop("dataset_appended", None)
+if append_result is not None:
+    st.session_state.use_dataset = True
+dataset_info = dataset_store.info()
+with col2:
+    use_dataset = dataset_info is not None and st.checkbox(text["saved_dataset"].format(**dataset_info), key="use_dataset")
+
+# Daftar sheet + kolom header workbook, dibaca sekali per file upload (tanpa membaca isi sheet)
+@st.cache_data(max_entries=8)
+def get_excel_layout(file_id, _data):
+    return excel_layout(io.BytesIO(_data))
+
+# Content hash file upload dihitung sekali per file (file_id + ukuran), bukan setiap rerun
+@st.cache_data(max_entries=16)
+def get_upload_hash(file_id, size, _data):
+    return content_hash(_data)
+
+# Opsi Excel: pilih sheet dan hanya kolom yang dibutuhkan (kolom lain tidak di-decode)
+excel_sheet = None
+excel_columns = None
+if uploaded_file is not None and uploaded_file.name.lower().endswith(OPENPYXL_EXTENSIONS):
+    try:
+        excel_sheets = get_excel_layout(uploaded_file.file_id, uploaded_file.getvalue())
+    except Exception:
+        # File rusak: error ditampilkan oleh langkah parsing di bawah
+        excel_sheets = {}
+    if excel_sheets:
+        with st.expander(f"📑 {text['excel_options']}", expanded=len(excel_sheets) > 1):
+            excel_sheet = st.selectbox(text["sheet"], list(excel_sheets), key="excel_sheet")
+            sheet_columns = excel_sheets[excel_sheet]
+            excel_columns = st.multiselect(
+                text["columns_to_load"], sheet_columns, default=sheet_columns, key=f"excel_columns:{excel_sheet}"
+            )
+        # Sheet pertama dengan semua kolom = default; tanpa kolom dipilih juga berarti semua kolom
+        if not excel_columns or excel_columns == sheet_columns:
+            excel_columns = None
+        if excel_sheet == next(iter(excel_sheets)):
+            excel_sheet = None
 
 # Load data from uploaded file or use sample
 df = None
-if uploaded_file is not None:
+ingest_info = None
+dataset_key = None
+if len(uploaded_files) > 1 or (use_local and not uploaded_files):
     try:
-        if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
+        if uploaded_files:
+            sources = [(f.name, f.getvalue()) for f in uploaded_files]
+            digests = [get_upload_hash(f.file_id, f.size, data) for f, (_, data) in zip(uploaded_files, sources)]
         else:
-            df = pd.read_excel(uploaded_file)
+            # Nama relatif terhadap folder bersama, supaya kolom Store tetap unik antar subfolder
+            paths = expand_sources(LOCAL_SOURCE)
+            if not paths:
+                raise FileNotFoundError(f"No .csv/.xlsx/.xls files match {LOCAL_SOURCE}")
+            root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+            sources = [(os.path.relpath(os.path.abspath(p), root), p) for p in paths]
+            digests = None
+        
+        progress_bar = st.progress(0.0)
+        
+        def show_file_progress(done, total, name, error):
+            progress_bar.progress(done / total, text=f"{done}/{total} files • {name}{' ⚠️' if error else ''}")
+        
+        def parse_sources(sources):
+            return parse_many(
+                sources,
+                executor=get_ingest_pool() if INGEST_WORKERS != 1 else None,
+                prepare=compact_data,
+                progress=show_file_progress
+            )
+        
+        df, ingest_info = timer.call("ingest", get_ingest_cache().load_many, sources, parse_sources, digests)
+        progress_bar.empty()
+        dataset_key = ingest_info['key']
         
-        # Clean column names
-        df.columns = [col.strip().replace(' ', '_') for col in df.columns]
+        failed = [item for item in df.attrs['sources'] if item['error']]
+        st.success(f"✅ {text['file_loaded']}")
+        st.info(f"📊 {len(df):,} rows, {sum(not is_internal(col) for col in df.columns)} columns loaded from "
+                f"{len(sources) - len(failed)}/{len(sources)} files")
+        if failed:
+            with st.expander(f"⚠️ {text['files_failed'].format(n=len(failed))}", expanded=True):
+                st.dataframe(pd.DataFrame(failed)[['file', 'error']], hide_index=True, use_container_width=True)
         
-        # Ensure date column exists
-        date_cols = [col for col in df.columns if 'date' in col.lower() or 'tanggal' in col.lower() or '日期' in col.lower()]
-        if date_cols:
-            df[date_cols[0]] = pd.to_datetime(df[date_cols[0]], errors='coerce')
+    except Exception as e:
+        st.error(f"{text['invalid_file']}: {str(e)}")
+        df = timer.call("sample_data", load_sample_data).copy(deep=False)
+        dataset_key = "sample"
+        use_sample = True
+elif uploaded_file is not None:
+    try:
+        is_large_csv = uploaded_file.name.lower().endswith('.csv') and uploaded_file.size > STREAM_AUTO_MB * 1024 ** 2
+        if uploaded_file.name.lower().endswith('.csv') and (use_streaming or is_large_csv):
+            # CSV dibaca per chunk dan langsung diagregasi; frame mentah tidak pernah utuh di memori
+            progress_bar = st.progress(0.0)
+            stream_start = datetime.now()
+            
+            def show_progress(rows, position):
+                elapsed = max((datetime.now() - stream_start).total_seconds(), 1e-6)
+                fraction = min(position / uploaded_file.size, 1.0) if position else 0.0
+                progress_bar.progress(fraction, text=f"{rows:,} rows • {rows / elapsed:,.0f} rows/s")
+            
+            def parse_streaming(name, data, key):
+                uploaded_file.seek(0)
+                return stream_csv(
+                    uploaded_file,
+                    store_dir=os.path.join(INGEST_CACHE_DIR, "streams", key),
+                    chunk_rows=STREAM_CHUNK_ROWS,
+                    progress=show_progress
+                )
+            
+            # Upload dibaca lewat buffer milik Streamlit (tanpa salinan getvalue) dan hanya
+            # di-hash sekali per file; rerun berikutnya langsung lookup cache
+            data = uploaded_file.getbuffer()
+            df, ingest_info = timer.call(
+                "ingest", get_ingest_cache().load, uploaded_file.name, data,
+                parse=parse_streaming, variant="stream",
+                digest=get_upload_hash(uploaded_file.file_id, uploaded_file.size, data)
+            )
+            del data
+            progress_bar.empty()
+        else:
+            # Parsing hanya sekali per isi file (+ sheet/kolom); rerun berikutnya diambil dari cache
+            excel_variant = ""
+            if excel_sheet is not None or excel_columns is not None:
+                excel_variant = json.dumps([excel_sheet, excel_columns], ensure_ascii=False)
+            data = uploaded_file.getvalue()
+            df, ingest_info = timer.call(
+                "ingest", get_ingest_cache().load, uploaded_file.name, data,
+                parse=lambda name, data, key: parse_file(name, data, sheet=excel_sheet, columns=excel_columns),
+                variant=excel_variant, digest=get_upload_hash(uploaded_file.file_id, uploaded_file.size, data)
+            )
+        dataset_key = ingest_info['key']
         
         st.success(f"✅ {text['file_loaded']}")
-        st.info(f"📊 {len(df)} rows, {len(df.columns)} columns loaded")
+        if 'streaming' in df.attrs:
+            st.info(f"📊 {df.attrs['streaming']['rows']:,} rows streamed → {len(df):,} daily aggregate rows")
+            st.caption(text["streaming_info"])
+        else:
+            st.info(f"📊 {len(df)} rows, {sum(not is_internal(col) for col in df.columns)} columns loaded")
         
     except Exception as e:
         st.error(f"{text['invalid_file']}: {str(e)}")
-        df = generate_sample_data()
+        df = timer.call("sample_data", load_sample_data).copy(deep=False)
+        dataset_key = "sample"
         use_sample = True
-elif use_sample:
-    df = generate_sample_data()
+elif use_sample and not use_dataset:
+    df = timer.call("sample_data", load_sample_data).copy(deep=False)
+    dataset_key = "sample"
     st.info(f"📋 {text['no_file']}")
 
+# ==================== DATASET PERSISTEN ====================
+# Data upload (bukan hasil streaming yang sudah diagregasi) bisa ditambahkan ke dataset tersimpan
+if df is not None and ingest_info is not None and 'streaming' not in df.attrs:
+    with col2:
+        if st.button(text["append_dataset"], key="append_dataset"):
+            try:
+                st.session_state.dataset_appended = timer.call("dataset_append", dataset_store.append, df)
+                st.rerun()
+            except SchemaError as e:
+                st.error(f"❌ {e}")
+if append_result is not None:
+    st.success(f"✅ {text['append_done'].format(**append_result)}")
+if use_dataset:
+    df = timer.call("dataset_load", load_dataset, dataset_info['version']).copy(deep=False)
+    dataset_key = f"dataset:{dataset_info['version']}"
+    st.info(f"📦 {text['saved_dataset'].format(**dataset_info)}: {len(df):,} rows, {sum(not is_internal(col) for col in df.columns)} columns")
+
+# Sesi ini memakai frame bersama `dataset_key`; frame tanpa sesi aktif dibersihkan setelah TTL
+if dataset_key is not None and get_shared_frames() is not None:
+    run_context = get_script_run_ctx()
+    get_shared_frames().acquire(dataset_key, run_context.session_id if run_context else "local")
+
 # Inisialisasi session state untuk selected_products
 if 'selected_products' not in st.session_state:
     st.session_state.selected_products = []
@@ -322,16 +672,20 @@ if 'selected_products' not in st.session_state:
 with st.sidebar:
     st.header("⚙️ " + text["filter_data"])
     
+    # State filter yang juga diterapkan ke cube agregasi
+    date_index = None
+    start_date = end_date = None
+    categories = []
+    selected_products = []
+    
     if df is not None:
-        # Kolom-kolom yang tersedia
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
-        object_cols = df.select_dtypes(include=['object']).columns.tolist()
-        
-        # Auto-detect kolom
-        # Cari kolom kategori (object dengan unique values < 20)
-        category_cols = [col for col in object_cols if df[col].nunique() < 20 and df[col].nunique() > 1]
-        product_cols = [col for col in object_cols if col not in category_cols and df[col].nunique() < 100]
+        # Kolom-kolom yang tersedia dan auto-detect kolom, dari profil dataset
+        # (kategori: unique values < 20, produk: teks lain yang bukan kolom ID)
+        profile = timer.call("profile", get_profile, dataset_key, df)
+        numeric_cols = profile['numeric_cols']
+        date_cols = profile['date_cols']
+        category_cols = profile['category_cols']
+        product_cols = profile['product_cols']
         
         # Pilih kolom value
         default_value_col = None
@@ -346,7 +700,9 @@ with st.sidebar:
         value_column = st.selectbox(
             text["value_column"],
             options=numeric_cols if numeric_cols else [],
-            index=numeric_cols.index(default_value_col) if default_value_col in numeric_cols else 0
+            index=numeric_cols.index(default_value_col) if default_value_col in numeric_cols else 0,
+            # Key per dataset (bukan label): pilihan tetap sama saat ganti bahasa
+            key=f"value_column:{dataset_key}"
         ) if numeric_cols else st.selectbox(text["value_column"], options=[])
         
         # Pilih kolom date
@@ -362,65 +718,90 @@ with st.sidebar:
         date_column = st.selectbox(
             text["date_column"],
             options=date_cols if date_cols else [],
-            index=date_cols.index(default_date_col) if default_date_col in date_cols else 0
+            index=date_cols.index(default_date_col) if default_date_col in date_cols else 0,
+            key=f"date_column:{dataset_key}"
         ) if date_cols else st.selectbox(text["date_column"], options=[])
         
         # Filter berdasarkan tanggal
-        if date_column and date_column in df.columns:
-            df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
-            min_date = df[date_column].min().date()
-            max_date = df[date_column].max().date()
+        date_index = timer.call("date_index", get_date_index, dataset_key, date_column, df) \
+            if date_column and date_column in df.columns else None
+        if date_index is not None and date_index.min_date is not None:
+            # Frame sudah diurutkan per tanggal; min/max diambil dari ujung index
+            df = date_index.frame
+            min_date = date_index.min_date
+            max_date = date_index.max_date
             
             date_range = st.date_input(
                 text["date_range"],
                 value=(min_date, max_date),
                 min_value=min_date,
-                max_value=max_date
+                max_value=max_date,
+                key=f"date_range:{dataset_key}:{date_column}"
             )
             
-            if len(date_range) == 2:
-                start_date, end_date = date_range
-                df_filtered = df[(df[date_column].dt.date >= start_date) & (df[date_column].dt.date <= end_date)]
-            else:
-                df_filtered = df
+            # Range slicing dengan binary search, tanpa copy
+            start_date = date_range[0] if len(date_range) > 0 else min_date
+            end_date = date_range[1] if len(date_range) == 2 else max_date
+            with timer.stage("date_filter", rows_in=len(df)) as stage:
+                row_range = date_index.bounds(start_date, end_date)
+                df_filtered = df.iloc[row_range[0]:row_range[1]]
+                stage.rows_out = len(df_filtered)
         else:
+            row_range = (0, len(df))
             df_filtered = df
         
+        # Filter nilai dikumpulkan dulu, lalu diterapkan sekali lewat bitmap index
+        value_filters = {}
+        
         # Filter kategori
         if category_cols:
             category_column = st.selectbox(
                 "Category Column",
                 options=category_cols,
-                index=0
+                index=0,
+                key=f"category_column:{dataset_key}"
             )
             
+            # Nilai filter tetap kanonik; hanya label opsi yang diterjemahkan
+            category_values = df_filtered[category_column].unique()
             categories = st.multiselect(
                 text["category"],
-                options=df_filtered[category_column].unique(),
-                default=df_filtered[category_column].unique()[:3] if len(df_filtered[category_column].unique()) > 3 else df_filtered[category_column].unique()
+                options=category_values,
+                default=category_values[:3],
+                format_func=display_category,
+                key=f"categories:{dataset_key}:{category_column}"
             )
             
             if categories:
-                df_filtered = df_filtered[df_filtered[category_column].isin(categories)]
+                value_filters[category_column] = categories
         
         # Filter produk dengan search
         if product_cols:
             product_column = st.selectbox(
                 "Product Column",
                 options=product_cols,
-                index=0
+                index=0,
+                key=f"product_column:{dataset_key}"
             )
             
             if product_column:
                 # Search box untuk produk
-                search_term = st.text_input(text["search_product"], "")
+                search_term = st.text_input(text["search_product"], "", key="search_term")
                 
-                all_products = df_filtered[product_column].unique()
-                
-                if search_term:
-                    filtered_products = [p for p in all_products if search_term.lower() in str(p).lower()]
-                else:
-                    filtered_products = all_products
+                # Lookup di index n-gram (substring + fuzzy), dibatasi ke kategori terpilih
+                search_index = timer.call(
+                    "search_index", get_search_index,
+                    dataset_key, product_column, category_column if category_cols else None, df
+                )
+                filtered_products = timer.call(
+                    "product_search", search_index.search,
+                    search_term, limit=PRODUCT_SEARCH_LIMIT, groups=categories or None
+                )
+                # Hint hanya jika daftar benar-benar terpotong di limit; total = produk di kategori terpilih
+                if not search_term and len(filtered_products) == PRODUCT_SEARCH_LIMIT:
+                    total_products = search_index.count(groups=categories or None)
+                    if total_products > PRODUCT_SEARCH_LIMIT:
+                        st.caption(text["search_hint"].format(shown=len(filtered_products), total=total_products))
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -430,20 +811,35 @@ with st.sidebar:
                     if st.button(text["clear_all"]):
                         st.session_state.selected_products = []
                 
+                # Produk yang sudah dipilih tetap ada di pilihan walau tidak cocok dengan pencarian
+                shown = set(filtered_products)
+                product_options = filtered_products + [p for p in st.session_state.selected_products if p not in shown]
+                
                 selected_products = st.multiselect(
                     text["products"],
-                    options=filtered_products,
+                    options=product_options,
                     default=st.session_state.selected_products
                 )
+                # Simpan pilihan supaya tidak hilang saat hasil pencarian (options) berubah
+                st.session_state.selected_products = selected_products
                 
                 if selected_products:
-                    df_filtered = df_filtered[df_filtered[product_column].isin(selected_products)]
+                    value_filters[product_column] = selected_products
+        
+        # Satu seleksi baris (bitmap AND/OR di dalam rentang tanggal), tanpa frame perantara
+        if value_filters:
+            filter_index = timer.call(
+                "filter_index", get_filter_index, dataset_key, date_column if date_index is not None else None, df
+            )
+            with timer.stage("value_filter", rows_in=len(df_filtered)) as stage:
+                df_filtered = filter_index.select(*row_range, value_filters)
+                stage.rows_out = len(df_filtered)
     else:
         st.warning("No data available. Please upload a file or use sample data.")
         df_filtered = pd.DataFrame()
 
 # Fungsi untuk membuat grafik dengan error handling - FIXED VERSION
-def create_safe_plotly_chart(fig, chart_title=""):
+def create_safe_plotly_chart(fig, chart_title="", **kwargs):
     """Fungsi aman untuk membuat plotly chart dengan error handling"""
     try:
         if fig is None:
@@ -466,7 +862,10 @@ def create_safe_plotly_chart(fig, chart_title=""):
         if fig.layout is None:
             fig.update_layout()
         
-        st.plotly_chart(fig, use_container_width=True)
+        # Waktu sejak tahap terakhir = membangun figure; lalu serialisasi + kirim ke frontend
+        timer.lap("figure")
+        with timer.stage("plotly_chart"):
+            return st.plotly_chart(fig, use_container_width=True, **kwargs)
         
     except Exception as e:
         st.markdown(f"""
@@ -481,108 +880,223 @@ def create_safe_plotly_chart(fig, chart_title=""):
             st.write(f"Error type: {type(e).__name__}")
             st.write(f"Figure type: {type(fig) if 'fig' in locals() else 'N/A'}")
 
-# Main dashboard hanya jika ada data
+def build_cube(store, date_column, value_column, category_column, product_column, df):
+    if store is not None and date_column == store.manifest()['date_column']:
+        # Rollup tersimpan di dataset dan diperbarui per append, tidak dihitung ulang dari seluruh histori
+        return store.rollup(value_column, category_column, product_column, df)
+    return RollupCube(df, date_column, value_column, category_column, product_column)
+
+# Cube exact dibangun di thread background, supaya pratinjau dari sampel bisa tampil lebih dulu
+@st.cache_resource
+def get_cube_pool():
+    return ThreadPoolExecutor(thread_name_prefix="cube")
+
+# Cube dibangun sekali per dataset + pilihan kolom (future dibagi ke semua sesi); filter cukup diterapkan ke cube
+@st.cache_resource(max_entries=8)
+def get_cube_job(dataset_key, date_column, value_column, category_column, product_column, _df):
+    store = get_dataset_store() if dataset_key.startswith("dataset:") else None
+    return get_cube_pool().submit(build_cube, store, date_column, value_column, category_column, product_column, _df)
+
+# Sampel bertingkat (hari x kategori) dibuat sekali per dataset dan dibagi ke semua sesi
+@st.cache_resource(max_entries=4)
+def get_sample(dataset_key, date_column, category_column, _df):
+    return StratifiedSample(_df, date_column, category_column, size=APPROX_SAMPLE_ROWS)
+
+@st.cache_resource(max_entries=8)
+def get_sample_cube(dataset_key, date_column, value_column, category_column, product_column, _sample):
+    return _sample.cube(value_column, category_column, product_column)
+
+# Prefix sum harian per kategori untuk perbandingan periode, sekali per cube
+@st.cache_resource(max_entries=8)
+def get_prefix_sums(dataset_key, date_column, value_column, category_column, product_column, _cube):
+    return PrefixSums(_cube)
+
+def format_delta(current, previous, decimals=0):
+    """Selisih terhadap periode pembanding (+ persen); None jika tidak ada pembanding"""
+    if previous is None:
+        return None
+    diff = current - previous
+    if not previous:
+        return f"{diff:+,.{decimals}f}"
+    return f"{diff:+,.{decimals}f} ({diff / previous:+.1%})"
+
+# Dimensi kalender (key minggu/bulan/kuartal per hari) dibangun sekali per dataset + kolom tanggal
+@st.cache_resource(max_entries=8)
+def get_calendar(dataset_key, date_column, _days):
+    return Calendar.from_days(_days)
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache(os.path.join(INGEST_CACHE_DIR, "exports"))
+
+# Cube untuk semua tab: exact dari job background, atau dari sampel selama job berjalan / jika gagal
+cube = None
+approximate = False
 if df_filtered is not None and not df_filtered.empty:
-    # Tab utama
-    tab1, tab2, tab3, tab4 = st.tabs([
-        f"📈 {text['overview']}",
-        f"📊 {text['categories']}",
-        f"🛍️ {text['products_tab']}",
-        f"📅 {text['timeseries']}"
-    ])
+    cube_columns = (
+        date_column if date_index is not None else None,
+        value_column,
+        category_column if 'category_column' in locals() else None,
+        product_column if 'product_column' in locals() else None
+    )
+    cube_job = timer.call("cube", get_cube_job, dataset_key, *cube_columns, df)
+    cube_error = cube_job.exception() if cube_job.done() else None
+    if cube_error is not None:
+        # Build yang gagal tidak disimpan: hanya entry ini yang dibuang, rerun berikutnya mencoba lagi
+        get_cube_job.clear(dataset_key, *cube_columns, df)
+        st.error(f"❌ {text['cube_failed']}: {type(cube_error).__name__}: {cube_error}")
+    
+    # Mode progresif: selama cube exact belum selesai (atau gagal), semua tab memakai cube dari sampel berbobot
+    can_sample = cube_columns[0] is not None and 'streaming' not in df.attrs
+    approximate = can_sample and (
+        cube_error is not None or (APPROX_ROWS > 0 and len(df) > APPROX_ROWS and not cube_job.done())
+    )
+    if approximate:
+        sample = timer.call("approx_sample", get_sample, dataset_key, cube_columns[0], cube_columns[2], df)
+        cube = timer.call("approx_cube", get_sample_cube, dataset_key, *cube_columns, sample)
+        info = text["sample_fallback" if cube_error is not None else "approximate_info"]
+        st.markdown(f":orange-badge[≈ {text['approximate']}] " + info.format(sample=len(sample), rows=len(df)))
+    elif cube_error is None:
+        cube = timer.call("cube_wait", cube_job.result)
+
+# Main dashboard hanya jika ada data (dan cube)
+if cube is not None:
+    is_currency = 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower()
+    with timer.stage("cube_filter", rows_in=len(cube.cube)) as stage:
+        cube_filtered = cube.filter(start_date, end_date, categories, selected_products)
+        stage.rows_out = len(cube_filtered)
+    # Identitas state filter saat ini (key cache untuk export)
+    filter_state = (
+        dataset_key, date_column, start_date, end_date,
+        cube.category_column, tuple(categories),
+        cube.product_column, tuple(selected_products)
+    )
     
-    with tab1:
+    # Tab utama: hanya section yang aktif yang dihitung dan dirender
+    section_labels = {
+        "overview": f"📈 {text['overview']}",
+        "categories": f"📊 {text['categories']}",
+        "products_tab": f"🛍️ {text['products_tab']}",
+        "timeseries": f"📅 {text['timeseries']}"
+    }
+    active_section = st.radio(
+        "Section",
+        options=list(section_labels),
+        format_func=section_labels.get,
+        horizontal=True,
+        key="active_section",
+        label_visibility="collapsed"
+    )
+    
+    if active_section == "overview":
+        totals = timer.call("summary", summary, cube_filtered)
+        
+        # Delta = selisih dengan periode pembanding, dari prefix sum (O(1) per kategori terpilih)
+        compare_to = None
+        estimates = None
+        if approximate:
+            # Interval kepercayaan untuk filter saat ini; perbandingan periode menunggu hasil exact
+            estimates = timer.call(
+                "approx_estimate", sample.estimate,
+                value_column, start_date, end_date, cube.category_column, categories, cube.product_column, selected_products
+            )
+        elif cube.date_column and start_date is not None:
+            compare_with = st.radio(
+                text["compare_with"],
+                options=["previous", "last_year"],
+                format_func=text["comparisons"].get,
+                horizontal=True,
+                key="compare_with"
+            )
+            prefix_sums = timer.call(
+                "prefix_sums", get_prefix_sums,
+                dataset_key, cube.date_column, value_column, cube.category_column, cube.product_column, cube
+            )
+            comparisons = timer.call(
+                "compare_periods", compare_periods,
+                cube, prefix_sums, start_date, end_date, categories, selected_products
+            )
+            compare_to = comparisons[compare_with]
+            compare_start, compare_end = comparison_ranges(start_date, end_date)[compare_with]
+            if compare_to is not None and compare_to['partial']:
+                # Periode pembanding terpotong awal data: selisih terhadap periode sebagian menyesatkan
+                compare_to = None
+                st.caption(text["partial_comparison"].format(
+                    start=compare_start, end=compare_end, first=from_day_key(prefix_sums.first_day)
+                ))
+            else:
+                st.caption(text["compare_range" if compare_to else "no_comparison"].format(start=compare_start, end=compare_end))
+        
+        def previous(metric):
+            return compare_to[metric] if compare_to and compare_to[metric] is not None else None
+        
+        approx = "≈ " if approximate else ""
+        
+        def confidence(metric, decimals=0):
+            if estimates is not None:
+                st.caption(text["confidence"].format(value=f"{estimates[metric][1]:,.{decimals}f}"))
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            total_value = df_filtered[value_column].sum() if value_column in df_filtered.columns else 0
+            total_value = totals['total']
             st.metric(
                 label=text["total"],
-                value=f"${total_value:,.0f}" if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else f"{total_value:,.0f}",
-                delta=f"{total_value * 0.05:,.0f}"
+                value=approx + (f"${total_value:,.0f}" if is_currency else f"{total_value:,.0f}"),
+                delta=format_delta(total_value, previous('total'))
             )
+            confidence('total')
         
         with col2:
-            avg_value = df_filtered[value_column].mean() if value_column in df_filtered.columns else 0
+            avg_value = totals['average']
             st.metric(
                 label=text["average"],
-                value=f"${avg_value:,.2f}" if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else f"{avg_value:,.2f}",
-                delta=f"{avg_value * 0.03:,.2f}"
+                value=approx + (f"${avg_value:,.2f}" if is_currency else f"{avg_value:,.2f}"),
+                delta=format_delta(avg_value, previous('average'), decimals=2)
             )
+            confidence('average', decimals=2)
         
         with col3:
-            total_transactions = len(df_filtered)
+            total_transactions = totals['transactions']
             st.metric(
                 label=text["transactions"],
-                value=f"{total_transactions:,}",
-                delta=f"{int(total_transactions * 0.02):,}"
+                value=approx + f"{total_transactions:,}",
+                delta=format_delta(total_transactions, previous('transactions'))
             )
+            confidence('transactions')
         
         with col4:
-            if 'product_column' in locals() and product_column in df_filtered.columns:
-                unique_products = df_filtered[product_column].nunique()
+            if totals['unique_products'] is not None:
+                unique_products = totals['unique_products']
             else:
-                unique_products = df_filtered.select_dtypes(include=['object']).iloc[:, 0].nunique() if len(df_filtered.select_dtypes(include=['object']).columns) > 0 else 0
+                unique_products = df_filtered.select_dtypes(include=['object', 'category']).iloc[:, 0].nunique() if len(df_filtered.select_dtypes(include=['object', 'category']).columns) > 0 else 0
             st.metric(
                 label=text["unique_products"],
-                value=f"{unique_products}",
-                delta=f"{int(unique_products * 0.01)}"
+                # Produk di sampel adalah batas bawah jumlah produk unik
+                value=("≥ " if approximate else "") + f"{unique_products}",
+                delta=format_delta(unique_products, previous('unique_products'))
             )
         
         # Grafik 1: Value per Kategori
         st.subheader(f"{value_column} by Category")
         try:
-            if 'category_column' in locals() and category_column in df_filtered.columns:
-                value_by_category = df_filtered.groupby(category_column)[value_column].sum().reset_index()
-                
-                fig1 = go.Figure(data=[
-                    go.Bar(
-                        x=value_by_category[category_column],
-                        y=value_by_category[value_column],
-                        marker_color=['#1E3A8A', '#3B82F6', '#60A5FA', '#93C5FD', '#BFDBFE', '#E0F2FE'],
-                        text=[f"${x:,.0f}" if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else f"{x:,.0f}" 
-                              for x in value_by_category[value_column]],
-                        textposition='auto'
-                    )
-                ])
-                
-                fig1.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    yaxis_title=f"{value_column} ({'$' if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else 'Units'})",
-                    xaxis_title=text["category"],
-                    height=400,
-                    showlegend=False
-                )
+            if cube.category_column:
+                value_by_category = timer.call("by_category", by_category, cube_filtered)
+                fig1 = charts.category_value_bar(localize_categories(value_by_category), value_column, is_currency, text["category"])
                 
                 create_safe_plotly_chart(fig1)
         except Exception as e:
             st.error(f"{text['error_chart']}: {str(e)}")
     
-    with tab2:
+    elif active_section == "categories":
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader(text["category_dist"])
             try:
-                if 'category_column' in locals() and category_column in df_filtered.columns:
-                    category_dist = df_filtered[category_column].value_counts().reset_index()
-                    category_dist.columns = ['Category', 'Count']
-                    
-                    # PERBAIKAN: Gunang px.pie langsung, tidak perlu konversi
-                    fig2 = px.pie(
-                        category_dist,
-                        values='Count',
-                        names='Category',
-                        hole=0.4,
-                        color_discrete_sequence=px.colors.sequential.Blues_r
-                    )
-                    
-                    fig2.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        height=400
-                    )
+                if cube.category_column:
+                    category_dist = timer.call("by_category", by_category, cube_filtered)
+                    fig2 = charts.category_pie(localize_categories(category_dist))
                     
                     create_safe_plotly_chart(fig2)
             except Exception as e:
@@ -591,32 +1105,9 @@ if df_filtered is not None and not df_filtered.empty:
         with col2:
             st.subheader(text["profit_margin"])
             try:
-                if 'Profit' in df_filtered.columns and 'Total_Price' in df_filtered.columns:
-                    profit_margin = df_filtered.groupby(category_column if 'category_column' in locals() else 'Category').agg({
-                        'Total_Price': 'sum',
-                        'Profit': 'sum'
-                    }).reset_index()
-                    
-                    profit_margin['Margin'] = (profit_margin['Profit'] / profit_margin['Total_Price']) * 100
-                    
-                    fig3 = go.Figure(data=[
-                        go.Bar(
-                            x=profit_margin[category_column if 'category_column' in locals() else 'Category'],
-                            y=profit_margin['Margin'],
-                            marker_color=profit_margin['Margin'],
-                            colorscale='Blues',
-                            text=[f"{x:.1f}%" for x in profit_margin['Margin']],
-                            textposition='auto'
-                        )
-                    ])
-                    
-                    fig3.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        yaxis_title="Profit Margin (%)",
-                        xaxis_title=text["category"],
-                        height=400
-                    )
+                if cube.has_profit and cube.category_column:
+                    profit_margin = timer.call("by_category", by_category, cube_filtered)
+                    fig3 = charts.profit_margin_bar(localize_categories(profit_margin), text["category"])
                     
                     create_safe_plotly_chart(fig3)
                 else:
@@ -624,91 +1115,131 @@ if df_filtered is not None and not df_filtered.empty:
             except Exception as e:
                 st.error(f"{text['error_chart']}: {str(e)}")
     
-    with tab3:
+    elif active_section == "products_tab":
         st.subheader(text["top_products"])
         try:
-            if 'product_column' in locals() and product_column in df_filtered.columns:
-                top_products = df_filtered.groupby(product_column).agg({
-                    value_column: 'sum'
-                }).nlargest(10, value_column).reset_index()
-                
-                fig4 = go.Figure(data=[
-                    go.Bar(
-                        y=top_products[product_column],
-                        x=top_products[value_column],
-                        orientation='h',
-                        marker_color='#3B82F6',
-                        text=[f"${x:,.0f}" if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else f"{x:,.0f}" 
-                              for x in top_products[value_column]],
-                        textposition='auto'
-                    )
-                ])
-                
-                fig4.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    xaxis_title=f"{value_column} ({'$' if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else 'Units'})",
-                    yaxis_title=text["products_tab"],
-                    height=500
-                )
+            if cube.product_column:
+                best_products = timer.call("top_products", top_products, cube_filtered, 10)
+                fig4 = charts.top_products_bar(best_products, value_column, is_currency, text["products_tab"])
                 
                 create_safe_plotly_chart(fig4)
         except Exception as e:
             st.error(f"{text['error_chart']}: {str(e)}")
         
-        # Tabel detail produk
+        # Tabel detail produk: diurutkan dan dipaginasi di server, hanya halaman aktif yang dibuat
         st.subheader(text["product_details"])
         try:
-            if 'product_column' in locals() and product_column in df_filtered.columns and 'category_column' in locals() and category_column in df_filtered.columns:
-                product_detail = df_filtered.groupby([category_column, product_column]).agg({
-                    value_column: 'sum'
-                }).reset_index().sort_values(value_column, ascending=False).head(20)
+            if cube.product_column:
+                sort_options = {"value": text["total"], "product": text["products_tab"]}
+                if cube.category_column:
+                    sort_options["category"] = text["category"]
                 
-                # Format angka
-                if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower():
-                    product_detail[value_column] = product_detail[value_column].apply(lambda x: f"${x:,.2f}")
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    sort_by = st.selectbox(text["sort_by"], options=list(sort_options), format_func=sort_options.get, key="sort_by")
+                with col2:
+                    page_size = st.selectbox(text["rows_per_page"], options=[20, 50, 100], index=0, key="page_size")
+                # Jumlah halaman dari filter saat ini; halaman tersimpan di-clamp setelah filter menyempit
+                total_rows = timer.call("product_detail_rows", product_detail_rows, cube_filtered)
+                pages = max(-(-total_rows // page_size), 1)
+                if st.session_state.get("page", 1) > pages:
+                    st.session_state.page = pages
+                with col3:
+                    page = st.number_input(text["page"], min_value=1, max_value=pages, step=1, key="page")
+                with col4:
+                    descending = st.checkbox(text["descending"], value=sort_by == "value", key=f"descending:{sort_by}")
+                
+                details, total_rows = timer.call(
+                    "product_detail", product_detail,
+                    cube_filtered, page=page - 1, page_size=page_size, sort_by=sort_by, descending=descending
+                )
+                details = localize_categories(details)
+                details.columns = [cube.category_column, cube.product_column, value_column][-len(details.columns):]
+                
+                column_config = {
+                    cube.product_column: st.column_config.TextColumn(text["products_tab"]),
+                    # Format angka di frontend; nilai tetap numerik
+                    value_column: st.column_config.NumberColumn(
+                        text["total"], format="dollar" if is_currency else "localized"
+                    )
+                }
+                if cube.category_column:
+                    column_config[cube.category_column] = st.column_config.TextColumn(text["category"])
                 
                 st.dataframe(
-                    product_detail,
-                    column_config={
-                        category_column: st.column_config.TextColumn(text["category"]),
-                        product_column: st.column_config.TextColumn(text["products_tab"]),
-                        value_column: st.column_config.TextColumn(text["total"])
-                    },
+                    details,
+                    column_config=column_config,
                     use_container_width=True,
                     hide_index=True
                 )
+                st.caption(text["page_info"].format(page=page, pages=pages, total=total_rows))
         except Exception as e:
             st.error(f"Error displaying product table: {str(e)}")
     
-    with tab4:
-        st.subheader(text["daily_trend"])
+    elif active_section == "timeseries":
+        calendar = timer.call("calendar", get_calendar, dataset_key, cube.date_column, cube.days) \
+            if cube.date_column else None
+        granularity = st.selectbox(
+            text["granularity"], options=list(GRANULARITIES), format_func=text["granularities"].get, key="granularity"
+        )
+        st.subheader(text["daily_trend"] if granularity == "day" else f"{text['trend']} ({text['granularities'][granularity]})")
         try:
-            if date_column and date_column in df_filtered.columns:
-                daily_data = df_filtered.groupby(date_column)[value_column].sum().reset_index()
+            if calendar is not None and granularity != "day":
+                # Total per periode: lookup key kalender + bincount atas hari unik
+                period_data = timer.call("periods", periods, cube_filtered, calendar, granularity)
+                fig5 = charts.trend_line(period_data, value_column, is_currency, text["date_range"])
+                create_safe_plotly_chart(fig5)
+            elif calendar is not None:
+                # Box select di grafik = zoom; rentang itu di-query ulang dengan resolusi penuh
+                trend_key = f"trend_chart_{st.session_state.get('trend_chart_version', 0)}"
+                trend_state = st.session_state.get(trend_key)
+                zoom_box = trend_state["selection"]["box"] if trend_state else None
                 
-                fig5 = go.Figure()
+                if zoom_box:
+                    zoom_start, zoom_end = sorted(pd.Timestamp(x) for x in zoom_box[0]["x"])
+                    trend_data = timer.call(
+                        "trend_detail", trend_detail, df_filtered, date_column, value_column, zoom_start, zoom_end
+                    )
+                    if st.button(text["reset_zoom"]):
+                        # Key baru = grafik baru tanpa selection
+                        st.session_state.trend_chart_version = st.session_state.get('trend_chart_version', 0) + 1
+                        st.rerun()
+                else:
+                    trend_data = timer.call("daily", daily, cube_filtered)
                 
-                fig5.add_trace(go.Scatter(
-                    x=daily_data[date_column],
-                    y=daily_data[value_column],
-                    mode='lines+markers',
-                    name=value_column,
-                    line=dict(color='#3B82F6', width=3),
-                    fill='tozeroy',
-                    fillcolor='rgba(59, 130, 246, 0.1)'
-                ))
+                averages = None
+                if not zoom_box and len(trend_data):
+                    trend_days = trend_data['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+                    first_day, last_day = int(trend_days[0]), int(trend_days[-1])
+                    # Cube ikut memuat hari-hari sebelum rentang, jadi awal rentang memakai jendela penuh
+                    history = cube.filter(
+                        from_day_key(first_day - max(MOVING_AVERAGE_WINDOWS) + 1), from_day_key(last_day),
+                        categories, selected_products
+                    )
+                    averages = timer.call("moving_averages", moving_averages, history, first_day, last_day)
                 
-                fig5.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    yaxis_title=f"{value_column} ({'$' if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else 'Units'})",
-                    xaxis_title=text["date_range"],
-                    hovermode='x unified',
-                    height=500
+                # Downsampling di server supaya titik yang dikirim ke browser tetap dalam budget
+                keep = timer.call(
+                    "downsample", downsample,
+                    trend_data['date'].to_numpy().astype(np.int64),
+                    trend_data['value'].to_numpy(),
+                    TREND_POINT_BUDGET,
+                    TREND_DOWNSAMPLE
                 )
+                trend_points = trend_data.iloc[keep]
+                if averages is not None:
+                    # Join integer: posisi hari titik tren di deret moving average
+                    positions = trend_points['date'].to_numpy().astype('datetime64[D]').astype(np.int64) - first_day
+                    averages = [(text["moving_average"].format(window=window), averages[f"ma_{window}"].to_numpy()[positions])
+                                for window in MOVING_AVERAGE_WINDOWS]
                 
-                create_safe_plotly_chart(fig5)
+                fig5 = charts.trend_line(
+                    trend_points, value_column, is_currency, text["date_range"], webgl=len(trend_points) > TREND_WEBGL_THRESHOLD,
+                    averages=averages
+                )
+                
+                create_safe_plotly_chart(fig5, on_select="rerun", selection_mode="box", key=trend_key)
+                st.caption(f"{len(trend_points):,} / {len(trend_data):,} points • {text['zoom_hint']}")
         except Exception as e:
             st.error(f"{text['error_chart']}: {str(e)}")
         
@@ -717,26 +1248,9 @@ if df_filtered is not None and not df_filtered.empty:
         with col1:
             st.subheader(text["monthly"])
             try:
-                if date_column and date_column in df_filtered.columns:
-                    df_filtered['Month'] = df_filtered[date_column].dt.strftime('%Y-%m')
-                    monthly_revenue = df_filtered.groupby('Month')[value_column].sum().reset_index()
-                    
-                    # PERBAIKAN: Gunang px.bar langsung
-                    fig6 = px.bar(
-                        monthly_revenue,
-                        x='Month',
-                        y=value_column,
-                        color=value_column,
-                        color_continuous_scale='Blues'
-                    )
-                    
-                    fig6.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        height=400,
-                        xaxis_title="Month",
-                        yaxis_title=f"{value_column} ({'$' if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else 'Units'})"
-                    )
+                if calendar is not None:
+                    monthly_revenue = timer.call("monthly", monthly, cube_filtered, calendar)
+                    fig6 = charts.monthly_bar(monthly_revenue, value_column, is_currency)
                     
                     create_safe_plotly_chart(fig6)
             except Exception as e:
@@ -745,26 +1259,9 @@ if df_filtered is not None and not df_filtered.empty:
         with col2:
             st.subheader(text["weekly"])
             try:
-                if date_column and date_column in df_filtered.columns:
-                    df_filtered['Week'] = df_filtered[date_column].dt.isocalendar().week
-                    weekly_avg = df_filtered.groupby('Week')[value_column].mean().reset_index()
-                    
-                    # PERBAIKAN: Gunang px.line langsung
-                    fig7 = px.line(
-                        weekly_avg,
-                        x='Week',
-                        y=value_column,
-                        markers=True,
-                        line_shape='spline'
-                    )
-                    
-                    fig7.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        height=400,
-                        xaxis_title="Week",
-                        yaxis_title=f"Average {value_column} ({'$' if 'price' in value_column.lower() or 'revenue' in value_column.lower() or 'profit' in value_column.lower() else 'Units'})"
-                    )
+                if calendar is not None:
+                    weekly_avg = timer.call("weekly_average", weekly_average, cube_filtered, calendar)
+                    fig7 = charts.weekly_line(weekly_avg, value_column, is_currency)
                     
                     create_safe_plotly_chart(fig7)
             except Exception as e:
@@ -777,21 +1274,26 @@ if df_filtered is not None and not df_filtered.empty:
     with col2:
         st.subheader("📥 " + text["export"])
         
-        # Konversi dataframe ke CSV
-        csv = df_filtered.to_csv(index=False).encode('utf-8')
+        # File export hanya dibuat saat tombol diklik (per chunk ke disk) dan di-cache per state filter
+        export_format = st.selectbox(text["export_format"], options=list(EXPORT_FORMATS), key="export_format")
+        export_data = df_filtered
+        
+        def generate_export():
+            return get_export_cache().read(export_data, filter_state, export_format)
         
         st.download_button(
-            label=text["download_csv"],
-            data=csv,
-            file_name=f"supermarket_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{language}.csv",
-            mime="text/csv",
+            label=f"{text['download_data']} ({export_format})",
+            data=generate_export,
+            file_name=f"supermarket_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{language}{EXPORT_FORMATS[export_format][0]}",
+            mime=EXPORT_FORMATS[export_format][1],
+            on_click="ignore",
             use_container_width=True
         )
     
     # Debug panel di sidebar
     with st.sidebar.expander("🔧 " + text["debug_info"]):
         st.write(f"**{text['data_shape']}:** {df_filtered.shape}")
-        st.write(f"**{text['columns']}:** {list(df_filtered.columns)}")
+        st.write(f"**{text['columns']}:** {[col for col in df_filtered.columns if not is_internal(col)]}")
         if value_column:
             st.write(f"**Value Column:** {value_column}")
         if date_column:
@@ -800,9 +1302,39 @@ if df_filtered is not None and not df_filtered.empty:
             st.write(f"**Category Column:** {category_column}")
         if 'product_column' in locals():
             st.write(f"**Product Column:** {product_column}")
+        compaction = df.attrs.get('compaction')
+        if compaction:
+            st.write(f"**Memory:** {compaction['before_mb']:,.1f} MB → {compaction['after_mb']:,.1f} MB")
+            if compaction['categorical']:
+                st.caption(f"category: {', '.join(compaction['categorical'])}")
+        if ingest_info:
+            cache_stats = get_ingest_cache().stats()
+            st.write(f"**Ingest Cache:** {ingest_info['status']} • {ingest_info['seconds'] * 1000:,.0f} ms")
+            st.caption(
+                f"memory: {cache_stats['memory_items']} file ({cache_stats['memory_mb']:,.1f} MB) • "
+                f"disk: {cache_stats['disk_items']} file ({cache_stats['disk_mb']:,.1f} MB)"
+            )
+        if get_shared_frames() is not None:
+            shared_stats = get_shared_frames().stats()
+            st.caption(
+                f"shared (mmap): {shared_stats['files']} file ({shared_stats['disk_mb']:,.1f} MB) • "
+                f"{shared_stats['mapped']} mapped • {shared_stats['sessions']} session(s)"
+            )
+        st.write("**Column Profile:**")
+        st.dataframe(profile_table(profile), hide_index=True)
+        if timer.enabled:
+            st.write(f"**Performance:** {timer.total_ms():,.0f} ms")
+            st.dataframe(
+                timer.frame(),
+                column_config={
+                    "ms": st.column_config.NumberColumn("ms", format="%.1f"),
+                    "mem_delta_mb": st.column_config.NumberColumn("Δ MB", format="%.1f")
+                },
+                hide_index=True
+            )
         st.write(f"**{text['sample_rows']}:**")
-        st.dataframe(df_filtered.head(3))
-else:
+        st.dataframe(df_filtered.head(3).drop(columns=[col for col in df_filtered.columns if is_internal(col)]))
+elif df_filtered is None or df_filtered.empty:
     st.warning("⚠️ No data available. Please upload an Excel file or use sample data.")
     st.info("""
     **Expected Excel format:**
@@ -834,8 +1366,22 @@ with st.expander("ℹ️ How to use this dashboard"):
     4. **Select date column** for time series analysis
     5. **Filter by category** and products as needed
     6. **Navigate through tabs** to see different visualizations
-    7. **Download filtered data** as CSV for further analysis
+    7. **Download filtered data** as CSV, Parquet or Excel for further analysis
     
     **Supported file formats:** Excel (.xlsx, .xls), CSV (.csv)
     **Languages:** English, Bahasa Indonesia, 中文 (Chinese)
     """)
+
+# Kirim hasil instrumentasi rerun ini ke log / file metrik
+get_metrics_registry().record(timer, dataset=dataset_key, section=st.session_state.get("active_section"))
+
+# Mode progresif: fragment mengecek job cube setiap detik (tanpa memblokir script) dan memicu
+# rerun penuh begitu hasil exact siap, sehingga pratinjau diganti hasil exact
+@st.fragment(run_every=1)
+def wait_for_cube(job):
+    if job.done():
+        st.rerun()
+    st.caption(f"⏳ {text['computing_exact']}")
+
+if approximate and not cube_job.done():
+    wait_for_cube(cube_job)
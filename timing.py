@@ -0,0 +1,183 @@
+"""Instrumentasi per tahap: wall time, baris masuk/keluar dan selisih memori (RSS) per rerun.
+
+Pemakaian:
+
+    timer = StageTimer()
+    with timer.stage("cube", rows_in=len(df)) as stage:
+        cube = build_cube(df)
+        stage.rows_out = len(cube)
+
+Jika dinonaktifkan, `stage()` mengembalikan objek no-op yang sama setiap kali, sehingga
+biayanya hanya satu pemanggilan method.
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes():
+    """RSS proses saat ini (Linux /proc); None jika tidak tersedia"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class _NullStage:
+    """Tahap no-op untuk timer nonaktif; atribut yang di-set diabaikan"""
+    rows_in = rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'rows_in', 'rows_out', '_start', '_rss')
+
+    def __init__(self, timer, name, rows_in):
+        self.timer = timer
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self._rss = rss_bytes()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        rss = rss_bytes()
+        self.timer._append(
+            self.name, seconds, self.rows_in, self.rows_out,
+            (rss - self._rss) / 1024 ** 2 if rss is not None and self._rss is not None else None,
+            exc_type.__name__ if exc_type else None
+        )
+        return False
+
+
+def _rows(obj):
+    """Jumlah baris untuk DataFrame/Series/array (tuple: elemen pertama); lainnya None"""
+    if isinstance(obj, tuple) and obj:
+        obj = obj[0]
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(obj)
+    return None
+
+
+class StageTimer:
+    """Catatan waktu semua tahap dalam satu rerun"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.records = []
+        self._start = self._last_end = time.perf_counter()
+
+    def stage(self, name, rows_in=None):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows_in)
+
+    def call(self, name, func, *args, **kwargs):
+        """Jalankan `func` sebagai satu tahap; baris masuk/keluar dari argumen pertama dan hasilnya"""
+        if not self.enabled:
+            return func(*args, **kwargs)
+        with _Stage(self, name, _rows(args[0]) if args else None) as stage:
+            result = func(*args, **kwargs)
+            stage.rows_out = _rows(result)
+        return result
+
+    def lap(self, name):
+        """Catat waktu sejak tahap terakhir selesai sebagai tahap `name` (mis. membangun figure)"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._append(name, now - self._last_end, None, None, None, None)
+
+    def _append(self, name, seconds, rows_in, rows_out, mem_delta_mb, error):
+        self.records.append({
+            'stage': name,
+            'ms': seconds * 1000,
+            'rows_in': rows_in,
+            'rows_out': rows_out,
+            'mem_delta_mb': mem_delta_mb,
+            'error': error,
+        })
+        self._last_end = time.perf_counter()
+
+    def total_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    def frame(self):
+        """Tabel breakdown per tahap untuk panel debug"""
+        return pd.DataFrame(
+            self.records, columns=['stage', 'ms', 'rows_in', 'rows_out', 'mem_delta_mb', 'error']
+        ).astype({'rows_in': 'Int64', 'rows_out': 'Int64'})
+
+
+class MetricsRegistry:
+    """Akumulasi metrik tahap per proses; ditulis sebagai JSON lines dan/atau file metrik Prometheus"""
+
+    def __init__(self, log_path=None, metrics_path=None):
+        self.log_path = log_path or None
+        self.metrics_path = metrics_path or None
+        self.reruns = 0
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, timer, **context):
+        """Simpan hasil satu rerun; `context` (mis. dataset, section) ikut ke log"""
+        if not timer.enabled:
+            return
+        total_ms = timer.total_ms()
+        with self._lock:
+            self.reruns += 1
+            for record in timer.records:
+                calls, seconds = self.stages.get(record['stage'], (0, 0.0))
+                self.stages[record['stage']] = (calls + 1, seconds + record['ms'] / 1000)
+            if self.log_path:
+                line = {'ts': time.time(), 'total_ms': total_ms, **context, 'stages': timer.records}
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(line, default=str) + '\n')
+            if self.metrics_path:
+                self._write_metrics(timer)
+
+    def _write_metrics(self, timer):
+        lines = [
+            '# TYPE supermarket_reruns_total counter',
+            f'supermarket_reruns_total {self.reruns}',
+            '# TYPE supermarket_stage_calls_total counter',
+        ]
+        lines += [f'supermarket_stage_calls_total{{stage="{name}"}} {calls}' for name, (calls, _) in self.stages.items()]
+        lines.append('# TYPE supermarket_stage_seconds_total counter')
+        lines += [f'supermarket_stage_seconds_total{{stage="{name}"}} {seconds:.6f}'
+                  for name, (_, seconds) in self.stages.items()]
+        # Tahap yang sama bisa muncul beberapa kali dalam satu rerun (mis. tiap grafik); dijumlahkan
+        last = {}
+        for record in timer.records:
+            last[record['stage']] = last.get(record['stage'], 0.0) + record['ms'] / 1000
+        lines.append('# TYPE supermarket_stage_last_seconds gauge')
+        lines += [f'supermarket_stage_last_seconds{{stage="{name}"}} {seconds:.6f}' for name, seconds in last.items()]
+        tmp_path = f"{self.metrics_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, self.metrics_path)